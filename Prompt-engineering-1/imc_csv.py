@@ -7,12 +7,15 @@ Calcula o IMC (Índice de Massa Corporal) a partir de um arquivo CSV e salva um
 com as colunas adicionais "imc" e "categoria_imc".
 
 - Detecta automaticamente o delimitador ("," ou ";") quando possível.
-- Tenta detectar automaticamente o separador decimal ("," ou ".") dos campos numéricos.
+- Tenta detectar automaticamente o separador decimal ("," ou ".") dos campos numéricos, em uma
+  amostra de pontos espalhados pelo arquivo (não só do início).
 - Identifica colunas de peso e altura mesmo com variações comuns de nomes (ex.: "Peso (kg)", "Altura em m").
 - Lida com números com separador de milhar.
+- Processa em streaming (linha a linha): o uso de memória não depende do tamanho do arquivo.
 
 Uso básico:
     python imc_csv.py entrada.csv -o saida.csv
+    python imc_csv.py pasta_com_csvs/ "outros/*.csv" -o pasta_saida/ --workers 8   (lote)
 
 Opções:
     --peso-col       Nome da coluna de peso (kg). Se omitido, tenta detectar.
@@ -21,6 +24,31 @@ Opções:
     --decimal        Separador decimal de entrada ("," ou "."). Se omitido, tenta detectar.
     --saida-decimal  Separador decimal para o valor de IMC na saída ("." padrão ou ",").
     --encoding       Encoding do arquivo (padrão: utf-8-sig).
+    --engine         "python" (padrão, linha a linha), "numpy" (colunar, requer numpy; lê
+                     como o posicional e converte, calcula e formata o IMC em lotes; o mais
+                     rápido), "positional" (linhas como listas, sem dicts) ou "passthrough"
+                     (repassa os bytes originais de cada linha; só peso/altura são lidos).
+    --workers        Número de processos; divide o arquivo em faixas de bytes (padrão: 1).
+                     Em lote (vários arquivos, diretórios ou globs), processa arquivos em paralelo.
+    --mmap           Lê a entrada via mmap (arquivos locais).
+    --colunas        Entrada Parquet: colunas mantidas além de peso/altura (padrão: identificação do paciente).
+    --incremental    Entradas append-only: só processa as linhas novas desde a execução anterior
+                     (estado em <saída>.manifest.json) e as acrescenta à saída.
+    --cache          Guarda uma cópia da saída em um cache em disco e a reutiliza quando a mesma entrada é
+                     processada com as mesmas opções (desligado por padrão: a cópia contém os dados dos
+                     pacientes; ver --cache-dir, --cache-max-mb, --cache-conteudo). --no-cache o desliga.
+    --no-schema-registry  Sempre detecta o formato, sem consultar o registro de layouts (ver --schema-dir).
+    --codec-thread   Entrada/saída comprimida: (des)compressão em uma thread separada do cálculo.
+    --profile        Mostra tempo de parede/CPU e linhas/s por etapa (sniff, read, detect, compute, write);
+                     --profile-out ARQ grava também um perfil cProfile (python -m pstats ARQ).
+
+Entrada Parquet (*.parquet, requer pyarrow): lê só as colunas necessárias, em lotes, e grava
+<entrada>_com_imc.parquet um row group por lote; "imc" sai como float e inválidos ficam nulos.
+
+Entrada e saída comprimidas (gzip, bz2, zstd; zstd requer zstandard): a entrada é detectada pelos
+bytes mágicos e a saída pela extensão (ex.: -o saida.csv.gz); ambas são processadas em fluxo.
+entrada.csv.gz gera entrada_com_imc.csv.gz. Entradas comprimidas são lidas com 1 worker, sem
+--mmap e sem --incremental.
 
 Notas:
 - Se a altura parecer estar em centímetros (valor > 3), será convertida para metros automaticamente.
@@ -29,124 +57,278 @@ Notas:
 from __future__ import annotations
 
 import argparse
+import codecs
 import csv
+import glob
+import hashlib
+import io
+import json
 import math
+import mmap
+import os
 import re
+import shutil
 import sys
-import unicodedata
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, replace
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# Pacote compartilhado imc_core, na raiz do repositório
+_REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import imc_core  # noqa: E402
+from imc_core.classification import category_indices  # noqa: E402
+from imc_core.compression import (  # noqa: E402
+    CodecUnavailableError,
+    compression_from_suffix,
+    detect_compression,
+    open_input,
+    open_output,
+    require_codec,
+    strip_compression_suffix,
+)
+from imc_core.detection import (  # noqa: E402
+    HEAD_ROWS,
+    CsvInputError,
+    DetectedLayout,
+    decide_decimal,
+    detect_delimiter,
+    detect_height_unit,
+    find_patient_columns,
+    has_decimal_evidence,
+    read_sample,
+    resolve_weight_height,
+)
+from imc_core.rows import (  # noqa: E402
+    BMI_CATEGORIES,
+    NumberParser,
+    PipelineConfig,
+    RunStats,
+    bmi_cells,
+    bom_free_encoding,
+    ends_in_quoted_field,
+    iter_bmi_lists,
+    last_index,
+    list_columns,
+    make_number_parser,
+    quote_patterns,
+)
+
+# Funções que imc_csv definia antes de imc_core existir: continuam importáveis daqui
+from imc_core.detection import (  # noqa: E402,F401
+    detect_decimal_from_values,
+    find_weight_height_columns,
+    normalize_name,
+)
+from imc_core.rows import categorize_bmi, parse_number  # noqa: E402,F401
+
+# Sufixo dos arquivos gerados (entrada.csv -> entrada_com_imc.csv)
+OUTPUT_SUFFIX = "_com_imc.csv"
+PARQUET_OUTPUT_SUFFIX = "_com_imc.parquet"
+
+# Extensões tratadas como Parquet (entrada e saída)
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+# Amostragem estratificada: até SAMPLE_STRATA pontos equidistantes do corpo do arquivo (no mínimo
+# SAMPLE_MIN_SPACING bytes entre eles), com no máximo SAMPLE_STRATUM_BYTES lidos em cada um.
+SAMPLE_STRATA = 16
+SAMPLE_STRATUM_BYTES = 16 * 1024
+SAMPLE_MIN_SPACING = 4 * 1024
+
+# Linhas por lote no engine "numpy".
+NUMPY_BATCH_ROWS = 65536
+# Dígitos da parte inteira do IMC formatados com operações de array no engine "numpy"; valores
+# maiores (e os que ficam a menos de 1e-6 de meio centésimo) usam a f-string, como bmi_cells.
+NUMPY_FORMAT_DIGITS = 7
+
+# Tamanho alvo (em bytes) de cada faixa do arquivo entregue a um worker no modo --workers.
+PARALLEL_CHUNK_BYTES = 16 * 1024 * 1024
 
+# Modo incremental: manifesto gravado ao lado da saída (saida.csv -> saida.csv.manifest.json)
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 2
+# Bytes do início e do fim do trecho já processado usados na impressão digital da entrada
+FINGERPRINT_BYTES = 64 * 1024
 
-def normalize_name(s: str) -> str:
-    """Normaliza nomes de colunas: minúsculas, sem acentos e apenas letras/números/_.
-    Ex.: "Peso (kg)" -> "peso_kg"
+# Cache de resultados: diretório (padrão: $IMC_CSV_CACHE_DIR ou ~/.cache/imc_csv) e tamanho máximo
+CACHE_DIR_ENV = "IMC_CSV_CACHE_DIR"
+CACHE_MAX_BYTES = 1024 * 1024 * 1024
+CACHE_VERSION = 1
+
+# Registro de layouts: formato detectado por cabeçalho, em <diretório do cache>/schemas
+SCHEMA_DIR_NAME = "schemas"
+SCHEMA_VERSION = 2
+
+
+# Ordem das etapas no relatório de --profile; etapas fora da lista aparecem no fim
+PROFILE_STAGES = ("cache", "manifest", "sniff", "read", "detect", "compute", "write", "parallel", "parquet")
+
+
+class StageProfiler:
+    """Tempo de parede, tempo de CPU e linhas por etapa do pipeline (--profile).
+
+    O tempo é exclusivo: cada intervalo vai para a etapa no topo da pilha, então "write" não
+    inclui a leitura e o cálculo das linhas que consome. Desativado, ``stage`` devolve um
+    contexto vazio e ``iter_stage`` o próprio iterável, sem custo por linha.
     """
-    s = s.strip().lower()
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = re.sub(r"[^a-z0-9]+", "_", s)
-    s = re.sub(r"_+", "_", s).strip("_")
-    return s
 
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.wall: Dict[str, float] = {}
+        self.cpu: Dict[str, float] = {}
+        self.rows: Dict[str, int] = {}
+        self.elapsed = 0.0
+        self._stack: List[str] = []
+        self._started = time.perf_counter()
+        self._mark = (self._started, time.process_time())
 
-def detect_delimiter(sample: str) -> str:
-    """Tenta detectar delimitador com csv.Sniffer; fallback para ";" se muitas ocorrências."""
-    try:
-        dialect = csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t"])  # pragma: no cover
-        return dialect.delimiter
-    except Exception:
-        # Heurística simples
-        commas = sample.count(",")
-        semis = sample.count(";")
-        if semis > commas:
-            return ";"
-        return ","
-
-
-def detect_decimal_from_values(values: Iterable[str]) -> str:
-    """Detecta separador decimal observando padrões 123,45 vs 123.45 nos valores."""
-    comma_hits = 0
-    dot_hits = 0
-    pattern_comma = re.compile(r"\d+,\d+")
-    pattern_dot = re.compile(r"\d+\.\d+")
-    for v in values:
-        if not isinstance(v, str):
-            continue
-        if pattern_comma.search(v):
-            comma_hits += 1
-        if pattern_dot.search(v):
-            dot_hits += 1
-    return "," if comma_hits > dot_hits else "."
+    def _switch(self) -> None:
+        wall, cpu = time.perf_counter(), time.process_time()
+        if self._stack:
+            name = self._stack[-1]
+            self.wall[name] = self.wall.get(name, 0.0) + wall - self._mark[0]
+            self.cpu[name] = self.cpu.get(name, 0.0) + cpu - self._mark[1]
+        self._mark = (wall, cpu)
+
+    def enter(self, name: str) -> None:
+        self._switch()
+        self._stack.append(name)
+
+    def leave(self) -> None:
+        self._switch()
+        self._stack.pop()
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.leave()
 
+    def stage(self, name: str):
+        """Contexto cujo tempo é atribuído à etapa ``name``."""
+        return self._timed(name) if self.enabled else nullcontext()
 
-def parse_number(text: str, decimal: str) -> Optional[float]:
-    """Converte string numérica para float respeitando separador decimal.
-    Trata separadores de milhar ("." ou ","). Retorna None se vazio/ inválido.
+    def _timed_iter(self, name: str, iterable: Iterable) -> Iterator:
+        it = iter(iterable)
+        n = 0
+        try:
+            while True:
+                self.enter(name)
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+                finally:
+                    self.leave()
+                n += 1
+                yield item
+        finally:
+            self.count(name, n)
+
+    def iter_stage(self, name: str, iterable: Iterable) -> Iterable:
+        """Atribui à etapa ``name`` o tempo de produzir cada item de ``iterable`` e conta os itens."""
+        return self._timed_iter(name, iterable) if self.enabled else iterable
+
+    def count(self, name: str, n: int) -> None:
+        if self.enabled:
+            self.rows[name] = self.rows.get(name, 0) + n
+
+    def merge(self, other: "StageProfiler") -> None:
+        """Soma as etapas de ``other`` (ex.: outro arquivo do lote) às deste perfil."""
+        for name, value in other.wall.items():
+            self.wall[name] = self.wall.get(name, 0.0) + value
+        for name, value in other.cpu.items():
+            self.cpu[name] = self.cpu.get(name, 0.0) + value
+        for name, value in other.rows.items():
+            self.rows[name] = self.rows.get(name, 0) + value
+        self.elapsed += other.elapsed
+
+    def finish(self) -> "StageProfiler":
+        self.elapsed = time.perf_counter() - self._started
+        return self
+
+    def report(self) -> List[str]:
+        """Linhas da tabela por etapa; "outros" é o tempo total não atribuído a nenhuma etapa."""
+        names = [s for s in PROFILE_STAGES if s in self.wall] + [s for s in self.wall if s not in PROFILE_STAGES]
+        total = self.elapsed or sum(self.wall.values())
+        lines = [f"{'etapa':10} {'parede (s)':>11} {'CPU (s)':>9} {'linhas':>10} {'linhas/s':>11} {'%':>6}"]
+        for name in names:
+            wall = self.wall[name]
+            rows = self.rows.get(name)
+            rate = f"{rows / wall:11.0f}" if rows and wall > 0 else f"{'':11}"
+            count = f"{rows:10d}" if rows is not None else f"{'':10}"
+            share = 100 * wall / total if total > 0 else 0.0
+            lines.append(f"{name:10} {wall:11.3f} {self.cpu.get(name, 0.0):9.3f} {count} {rate} {share:5.1f}%")
+        other = max(0.0, total - sum(self.wall.values()))
+        share = 100 * other / total if total > 0 else 0.0
+        lines.append(f"{'outros':10} {other:11.3f} {'':9} {'':10} {'':11} {share:5.1f}%")
+        lines.append(f"{'total':10} {total:11.3f}")
+        return lines
+
+
+# Perfil desativado usado quando --profile não foi pedido
+_NO_PROFILE = StageProfiler(enabled=False)
+
+
+def enrich_row(
+    row: Dict[str, str],
+    weight_col: str,
+    height_col: str,
+    decimal_in: str,
+    parse: Optional[NumberParser] = None,
+) -> bool:
+    """Preenche "imc" e "categoria_imc" na própria linha. Retorna False se os dados forem inválidos.
+
+    ``parse`` permite reaproveitar um parser de make_number_parser entre linhas.
     """
-    if text is None:
-        return None
-    if isinstance(text, (int, float)):
-        return float(text)
-    s = str(text).strip()
-    if s == "":
-        return None
-    # Remove espaços e símbolos não numéricos exceto dígitos, separador decimal e sinal
-    s = s.replace("\u00A0", " ").strip()
+    parse = parse or make_number_parser(decimal_in)
+    row["imc"], row["categoria_imc"], valid = bmi_cells(row.get(weight_col), row.get(height_col), parse)
+    return valid
 
-    # Normaliza separadores: remove milhares e converte decimal para ponto
-    if decimal == ",":
-        # Formatos possíveis: 1.234,56 (pt-BR) ou 1234,56
-        s = s.replace(".", "")
-        s = s.replace(",", ".")
-    else:
-        # decimal == ".": formatos 1,234.56 (en) ou 1234.56
-        s = s.replace(",", "")
-    try:
-        return float(s)
-    except ValueError:
-        return None
 
+def iter_bmi_rows(
+    rows: Iterable[Dict[str, str]],
+    weight_col: str,
+    height_col: str,
+    decimal_in: str,
+    stats: Optional[RunStats] = None,
+) -> Iterator[Dict[str, str]]:
+    """Versão em streaming de compute_bmi_for_rows: enriquece e devolve uma linha por vez.
 
-def categorize_bmi(bmi: float) -> str:
-    if math.isnan(bmi) or math.isinf(bmi):
-        return ""
-    if bmi < 18.5:
-        return "Abaixo do peso"
-    if bmi < 25:
-        return "Peso normal"
-    if bmi < 30:
-        return "Sobrepeso"
-    if bmi < 35:
-        return "Obesidade grau I"
-    if bmi < 40:
-        return "Obesidade grau II"
-    return "Obesidade grau III"
-
-
-def find_weight_height_columns(fieldnames: List[str]) -> Tuple[Optional[str], Optional[str]]:
-    weight_keys = {
-        "peso",
-        "peso_kg",
-        "massa",
-        "massa_kg",
-        "weight",
-        "weight_kg",
-        "mass",
-        "mass_kg",
-    }
-    height_keys = {
-        "altura",
-        "altura_m",
-        "estatura",
-        "height",
-        "height_m",
-        "tamanho",
-    }
-    norm_to_orig: Dict[str, str] = {normalize_name(h): h for h in fieldnames}
-    weight_col = next((norm_to_orig[n] for n in norm_to_orig if n in weight_keys), None)
-    height_col = next((norm_to_orig[n] for n in norm_to_orig if n in height_keys), None)
-    return weight_col, height_col
+    Nada é acumulado em memória; os contadores, se desejados, vão para ``stats``.
+    """
+    stats = stats if stats is not None else RunStats()
+    parse = make_number_parser(decimal_in)
+    for row in rows:
+        stats.total += 1
+        if not enrich_row(row, weight_col, height_col, decimal_in, parse):
+            stats.errors += 1
+        yield row
 
 
 def compute_bmi_for_rows(
@@ -156,135 +338,1754 @@ def compute_bmi_for_rows(
     decimal_in: str,
 ) -> Tuple[List[Dict[str, str]], int]:
     """Enriquece as linhas com IMC e categoria. Retorna (linhas, erros)."""
-    errors = 0
-    enriched: List[Dict[str, str]] = []
+    stats = RunStats()
+    enriched = list(iter_bmi_rows(rows, weight_col, height_col, decimal_in, stats))
+    return enriched, stats.errors
+
+
+def _parse_number_array(np, values: List[Optional[str]], parse: NumberParser, decimal: str):
+    """Equivalente colunar de parse_number. Retorna (valores float, máscara de inválidos).
+
+    O lote vai inteiro para ``np.asarray(..., dtype=float64)``, que converte cada texto como
+    float(); com decimal ",", depois de trocar "," por "." em uma única passada sobre o lote (só
+    quando nenhuma célula tem ".", o separador de milhar). Se algum texto não converter (vazio,
+    "n/d", "1.234,5"), o lote volta para o parser célula a célula (make_number_parser), então os
+    dois engines aceitam e recusam exatamente os mesmos textos.
+    """
+    cells: Optional[List[Optional[str]]] = values
+    if decimal == ",":
+        try:
+            joined = "\x00".join(values)
+        except TypeError:
+            cells = None  # coluna ausente (None)
+        else:
+            translated = joined.replace(",", ".").split("\x00")
+            # "\x00" dentro de alguma célula mudaria a contagem
+            cells = translated if "." not in joined and len(translated) == len(values) else None
+    arr = None
+    if cells is not None:
+        try:
+            arr = np.asarray(cells, dtype=np.float64)  # None vira NaN
+        except ValueError:
+            pass
+    if arr is None:
+        parsed = [parse(v) for v in values]
+        arr = np.array(parsed, dtype=np.float64)
+        values = parsed
+    invalid = np.zeros(len(values), dtype=bool)
+    nan_idx = np.flatnonzero(np.isnan(arr))
+    # NaN também vem de textos como "nan", que são válidos para parse_number
+    invalid[nan_idx] = [values[i] is None for i in nan_idx.tolist()]
+    return arr, invalid
+
+
+def _format_bmi_array(np, bmi, ok, decimal: str) -> List[str]:
+    """``f"{valor:.2f}"`` (com ``decimal`` no lugar do ponto) onde ``ok``, "" no resto.
+
+    Arredonda ``bmi * 100`` para centavos inteiros e escreve os dígitos de todas as células em um
+    único buffer de bytes, separado por quebras de linha, que vira a lista de strings em um só
+    split. rint(v * 100) só pode divergir do arredondamento da f-string perto de meio centésimo;
+    esses valores, e os com mais de NUMPY_FORMAT_DIGITS dígitos inteiros, usam a f-string.
+    """
+    scaled = np.where(ok, bmi, 0.0) * 100.0
+    cents = np.rint(scaled)
+    fast = ok & (np.abs(scaled - np.floor(scaled) - 0.5) > 1e-6) & (cents < 10.0 ** (NUMPY_FORMAT_DIGITS + 2))
+    whole, frac = np.divmod(np.where(fast, cents, 0.0).astype(np.int64), 100)
+    digits = np.ones(len(bmi), dtype=np.int64)
+    for k in range(1, NUMPY_FORMAT_DIGITS):
+        digits += whole >= 10**k
+    length = np.where(fast, digits + 3, 0) + 1  # dígitos, separador, 2 casas e "\n"
+    end = np.cumsum(length)
+    buf = np.full(int(end[-1]) if len(end) else 0, ord("\n"), dtype=np.uint8)
+    rows = np.flatnonzero(fast)
+    whole, frac = whole[rows], frac[rows]
+    digits = digits[rows]
+    point = (end - length)[rows] + digits  # posição do separador decimal de cada valor
+    for k in range(NUMPY_FORMAT_DIGITS):
+        has = np.flatnonzero(digits > k) if k else slice(None)
+        buf[(point - 1 - k)[has]] = (whole[has] // 10**k) % 10 + ord("0")
+    buf[point] = ord(decimal)
+    buf[point + 1] = frac // 10 + ord("0")
+    buf[point + 2] = frac % 10 + ord("0")
+    out = buf.tobytes().decode("ascii").split("\n")
+    out.pop()  # depois da última quebra de linha
+    for i in np.flatnonzero(ok & ~fast).tolist():
+        out[i] = f"{bmi[i]:.2f}".replace(".", decimal)
+    return out
+
+
+def compute_bmi_columns(
+    weights: List[Optional[str]],
+    heights: List[Optional[str]],
+    decimal_in: str,
+    decimal_out: str = ".",
+) -> Tuple[List[str], List[str], int]:
+    """Calcula IMC e categoria para colunas inteiras com NumPy.
+
+    Mesmas regras de enrich_row (conversão cm -> m, linhas inválidas, formatação com 2 casas),
+    porém como operações sobre arrays, da conversão dos textos à formatação do IMC (com
+    ``decimal_out``). Retorna (imc formatado, categorias, erros).
+    """
+    import numpy as np
+
+    parse = make_number_parser(decimal_in)
+    w, w_invalid = _parse_number_array(np, weights, parse, decimal_in)
+    h, h_invalid = _parse_number_array(np, heights, parse, decimal_in)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore", under="ignore"):
+        h = np.where(h > 3, h / 100.0, h)
+        h2 = h * h
+        # h2 == 0 cobre tanto altura zero quanto o underflow que no Python vira ZeroDivisionError
+        error = w_invalid | h_invalid | (h2 == 0)
+        bmi = w / h2
+        ok = ~error & (bmi > 0) & np.isfinite(bmi)
+    labels = np.array(("",) + BMI_CATEGORIES, dtype=object)
+    idx = np.where(ok, category_indices(np, np.where(ok, bmi, 0.0)) + 1, 0)
+    return _format_bmi_array(np, bmi, ok, decimal_out), labels[idx].tolist(), int(error.sum())
+
+
+def iter_bmi_lists_numpy(
+    rows: Iterable[List[str]],
+    config: PipelineConfig,
+    stats: Optional[RunStats] = None,
+    batch_size: int = NUMPY_BATCH_ROWS,
+) -> Iterator[List[str]]:
+    """Engine colunar: linhas como listas (como iter_bmi_lists), calculadas em lotes com compute_bmi_columns.
+
+    Produz exatamente a mesma saída de iter_bmi_lists; a memória fica limitada a um lote.
+    """
+    stats = stats if stats is not None else RunStats()
+    columns = list_columns(config)
+    width, tail = columns.width, columns.tail
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        for i, row in enumerate(batch):
+            n = len(row)
+            if n != width:
+                row = batch[i] = row[:width] if n > width else row + [""] * (width - n)
+            if tail:
+                row.extend(tail)
+        missing = [None] * len(batch)
+        imc, categories, errors = compute_bmi_columns(
+            [row[columns.weight_idx] for row in batch] if columns.weight_idx is not None else missing,
+            [row[columns.height_idx] for row in batch] if columns.height_idx is not None else missing,
+            config.decimal_in,
+            config.decimal_out,
+        )
+        stats.total += len(batch)
+        stats.errors += errors
+        for row, value, category in zip(batch, imc, categories):
+            row[columns.imc_idx] = value
+            row[columns.category_idx] = category
+            for dst, src in columns.duplicates:
+                row[dst] = row[src]
+        yield from batch
+
+
+ENGINES = {
+    "python": iter_bmi_rows,
+}
+
+
+# Engines que trabalham com linhas em lista (csv.reader/csv.writer) em vez de dicts
+POSITIONAL_ENGINES = {
+    "positional": iter_bmi_lists,
+    "numpy": iter_bmi_lists_numpy,
+}
+
+
+def iter_raw_records(lines: Iterable[bytes], delimiter: bytes = b",", quotechar: bytes = b'"') -> Iterator[bytes]:
+    """Agrupa linhas físicas (bytes, com terminador) em registros CSV.
+
+    Uma linha que termina dentro de um campo entre aspas (ver ends_in_quoted_field) é juntada às
+    seguintes até o campo fechar. Aspas no meio de um campo sem aspas são texto comum, como no csv.
+    """
+    pending: List[bytes] = []
+    in_quotes = False
+    for line in lines:
+        if not in_quotes and quotechar not in line:
+            yield line
+            continue
+        in_quotes = ends_in_quoted_field(line, in_quotes, delimiter, quotechar)
+        if in_quotes:
+            pending.append(line)
+        elif pending:
+            pending.append(line)
+            yield b"".join(pending)
+            pending = []
+        else:
+            yield line
+    if pending:
+        yield b"".join(pending)
+
+
+def split_terminator(record: bytes) -> Tuple[bytes, bytes]:
+    """Separa o registro bruto do seu terminador de linha ("\r\n", "\n" ou nenhum)."""
+    if record.endswith(b"\r\n"):
+        return record[:-2], b"\r\n"
+    if record.endswith(b"\n"):
+        return record[:-1], b"\n"
+    return record, b""
+
+
+def iter_passthrough_records(
+    records: Iterable[bytes],
+    config: PipelineConfig,
+    stats: Optional[RunStats] = None,
+) -> Iterator[bytes]:
+    """Engine de repasse: devolve cada registro com os bytes originais + os campos de IMC.
+
+    Só as colunas de peso e altura são decodificadas e convertidas; o resto da linha é copiado
+    como está (sem dict, sem re-aspas). Registros com aspas passam pelo csv apenas para
+    localizar os campos, e os que não têm o mesmo número de colunas do cabeçalho são
+    normalizados (completados/cortados) como nos demais engines. Linhas vazias são ignoradas.
+    """
+    stats = stats if stats is not None else RunStats()
+    parse = make_number_parser(config.decimal_in)
+    encoding = config.encoding
+    delimiter = config.delimiter
+    delim = delimiter.encode("ascii")
+    width = len(config.fieldnames)
+    weight_idx = last_index(config.fieldnames, config.weight_col)
+    height_idx = last_index(config.fieldnames, config.height_col)
+    wanted = [i for i in (weight_idx, height_idx) if i is not None]
+    maxsplit = max(wanted) + 1 if wanted else 0
+    default_term = config.line_terminator.encode("ascii")
+    comma_out = config.decimal_out == ","
+    quote_imc = comma_out and delimiter == ","
+    out_encoding = bom_free_encoding(encoding)
+    category_bytes = {c: c.encode(out_encoding) for c in ("",) + BMI_CATEGORIES}
+    for record in records:
+        body, term = split_terminator(record)
+        if not body:
+            continue
+        if b'"' not in body and body.count(delim) + 1 == width:
+            parts = body.split(delim, maxsplit)
+            weight_raw = parts[weight_idx].decode(encoding, "replace") if weight_idx is not None else None
+            height_raw = parts[height_idx].decode(encoding, "replace") if height_idx is not None else None
+            pieces = [(body, weight_raw, height_raw)]
+        else:
+            text = body.decode(encoding, "replace")
+            try:
+                parsed = [next(csv.reader([text], delimiter=delimiter), [])]
+                rewrite = False
+            except csv.Error:
+                # O csv não leu o trecho como um só registro (ex.: "\r" solto em campo sem aspas):
+                # refaz o trecho como o engine posicional, regravando cada registro que o csv encontrar
+                parsed = [row for row in csv.reader(io.StringIO(text, newline=""), delimiter=delimiter) if row]
+                rewrite = True
+            pieces = []
+            for fields in parsed:
+                weight_raw = fields[weight_idx] if weight_idx is not None and weight_idx < len(fields) else None
+                height_raw = fields[height_idx] if height_idx is not None and height_idx < len(fields) else None
+                if rewrite or len(fields) != width:
+                    fields = fields[:width] + [""] * (width - len(fields))
+                    line = io.StringIO()
+                    csv.writer(line, delimiter=delimiter, lineterminator="").writerow(fields)
+                    body = line.getvalue().encode(out_encoding)
+                pieces.append((body, weight_raw, height_raw))
+        for body, weight_raw, height_raw in pieces:
+            imc, category, valid = bmi_cells(weight_raw, height_raw, parse)
+            stats.total += 1
+            if not valid:
+                stats.errors += 1
+            if comma_out:
+                imc = imc.replace(".", ",")
+                if quote_imc and imc:
+                    imc = f'"{imc}"'
+            yield body + delim + imc.encode("ascii") + delim + category_bytes[category] + (term or default_term)
+
+
+# Engines que trabalham sobre os bytes brutos do arquivo
+RAW_ENGINES = {
+    "passthrough": iter_passthrough_records,
+}
+
+
+def write_rows(rows: Iterable[Dict[str, str]], out: TextIO, config: PipelineConfig) -> None:
+    """Grava as linhas enriquecidas (sem cabeçalho) ajustando o decimal de saída."""
+    # extrasaction='ignore' garante que chaves desconhecidas (ex.: '_rest') não causem erro
+    writer = csv.DictWriter(
+        out, fieldnames=config.out_fields, delimiter=config.delimiter, extrasaction="ignore"
+    )
     for row in rows:
-        weight_raw = row.get(weight_col)
-        height_raw = row.get(height_col)
-        w = parse_number(weight_raw, decimal_in)
-        h = parse_number(height_raw, decimal_in)
-        bmi_value: Optional[float] = None
-        category = ""
-        if w is None or h is None or h == 0:
-            errors += 1
+        # Ajusta decimal de saída, se necessário
+        if config.decimal_out == "," and row.get("imc"):
+            row["imc"] = row["imc"].replace(".", ",")
+        writer.writerow(row)
+
+
+def iter_body_rows(f: Iterable, config: PipelineConfig) -> Iterator:
+    """Linhas do corpo (sem cabeçalho) de ``f`` no formato esperado pelo engine.
+
+    ``f`` é um arquivo ou qualquer iterável de linhas (com terminador): bytes para os
+    engines de RAW_ENGINES, texto para os demais.
+    """
+    if config.engine in RAW_ENGINES:
+        return iter_raw_records(f, config.delimiter.encode("ascii"))
+    if config.engine in POSITIONAL_ENGINES:
+        # DictReader ignora linhas vazias; o caminho posicional faz o mesmo
+        return (row for row in csv.reader(f, delimiter=config.delimiter) if row)
+    # restkey evita chaves None quando há colunas extras em alguma linha
+    return csv.DictReader(f, fieldnames=list(config.fieldnames), delimiter=config.delimiter, restkey="_rest")
+
+
+def write_body(
+    rows: Iterable, out: IO, config: PipelineConfig, stats: RunStats, profiler: StageProfiler = _NO_PROFILE
+) -> None:
+    """Passa as linhas do corpo pelo engine configurado e grava o resultado em ``out``."""
+    rows = profiler.iter_stage("read", rows)
+    before = stats.total
+    with profiler.stage("write"):
+        if config.engine in RAW_ENGINES:
+            out.writelines(profiler.iter_stage("compute", RAW_ENGINES[config.engine](rows, config, stats)))
+        elif config.engine in POSITIONAL_ENGINES:
+            csv.writer(out, delimiter=config.delimiter).writerows(
+                profiler.iter_stage("compute", POSITIONAL_ENGINES[config.engine](rows, config, stats))
+            )
+        else:
+            engine = ENGINES[config.engine]
+            computed = engine(rows, config.weight_col, config.height_col, config.decimal_in, stats)
+            write_rows(profiler.iter_stage("compute", computed), out, config)
+    profiler.count("write", stats.total - before)
+
+
+def iter_mapped_lines(mm: mmap.mmap, start: int, end: int) -> Iterator[bytes]:
+    """Linhas físicas (com "\n") do trecho [start, end) de um arquivo mapeado em memória.
+
+    mmap.readline percorre o mapeamento direto, sem o buffer de leitura de um arquivo comum,
+    e o trecho não é copiado de uma vez: só cada linha vira bytes.
+    """
+    mm.seek(start)
+    readline = mm.readline
+    pos = start
+    while pos < end:
+        line = readline()
+        if not line:
+            break
+        if pos + len(line) > end:
+            line = line[: end - pos]
+        pos += len(line)
+        yield line
+
+
+def iter_file_lines(f: IO[bytes], start: int, end: int) -> Iterator[bytes]:
+    """Linhas físicas (com "\n") do trecho [start, end) de um arquivo binário, lidas em streaming.
+
+    Bytes além de ``end`` (ex.: gravados por outro processo durante a leitura) são ignorados.
+    """
+    f.seek(start)
+    pos = start
+    for line in f:
+        if pos >= end:
+            break
+        if pos + len(line) > end:
+            line = line[: end - pos]
+        pos += len(line)
+        yield line
+
+
+def decoded_body_rows(lines: Iterable[bytes], config: PipelineConfig) -> Iterator:
+    """Linhas do corpo a partir de linhas físicas em bytes, no formato esperado pelo engine."""
+    if config.engine in RAW_ENGINES:
+        return iter_body_rows(lines, config)
+    codec = bom_free_encoding(config.encoding)
+    return iter_body_rows((line.decode(codec) for line in lines), config)
+
+
+def mapped_body_rows(mm: mmap.mmap, start: int, end: int, config: PipelineConfig) -> Iterator:
+    """Linhas do corpo em [start, end) do mapeamento, no formato esperado pelo engine."""
+    return decoded_body_rows(iter_mapped_lines(mm, start, end), config)
+
+
+def write_mapped_body(
+    in_path: Path, out: IO, config: PipelineConfig, stats: RunStats, profiler: StageProfiler = _NO_PROFILE
+) -> None:
+    """Processa o corpo do arquivo (após o cabeçalho) lendo-o via mmap."""
+    data_start = find_record_boundaries(in_path, 0, [0], config.delimiter)
+    if not data_start:
+        return  # só cabeçalho
+    with in_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        write_body(mapped_body_rows(mm, data_start[0], len(mm), config), out, config, stats, profiler)
+
+
+def iter_record_ends(
+    path: Path,
+    start: int,
+    end: Optional[int] = None,
+    delimiter: str = ",",
+    block_size: int = 1 << 20,
+) -> Iterator[Tuple[bytes, int, int, int]]:
+    """Varre [start, end) (padrão: até o fim do arquivo) e devolve trechos ``(buf, base, i, j)``
+    em que toda quebra de linha de ``buf[i:j]`` encerra um registro CSV.
+
+    ``base`` é o offset de ``buf[0]`` no arquivo; ``start`` deve ser início de registro. As aspas
+    seguem as regras do csv (como em ends_in_quoted_field): quebras de linha dentro de campos entre
+    aspas nunca aparecem nos trechos, e aspas no meio de um campo sem aspas não mudam nada. Só
+    blocos com algum campo entre aspas que atravessa uma quebra de linha são percorridos campo a
+    campo; os demais viram um único trecho. ``buf[i]`` é início de linha, exceto logo após um
+    desses campos (o resto do registro dele, que nunca é uma linha vazia).
+    """
+    open_at_newline, quoted_field = quote_patterns(delimiter.encode("ascii"))
+    with path.open("rb") as f:
+        f.seek(start)
+        pos = start  # offset absoluto do próximo byte a ler
+        base = start  # offset absoluto de carry[0]
+        carry = b""  # registro ainda incompleto (começa sempre em início de registro)
+        while end is None or pos < end:
+            # Um registro enorme (campo entre aspas de vários blocos) é relido só O(log n) vezes
+            size = max(block_size, len(carry))
+            data = f.read(size if end is None else min(size, end - pos))
+            if not data:
+                break
+            pos += len(data)
+            buf = carry + data if carry else data
+            region = buf.rfind(b"\n") + 1  # só linhas completas; o resto fica para o próximo bloco
+            keep = region
+            if not region:
+                pass
+            elif buf.find(b'"', 0, region) == -1 or open_at_newline.search(buf, 0, region) is None:
+                yield buf, base, 0, region
+            else:
+                i = 0
+                record_start = 0  # início do registro em andamento
+                for match in quoted_field.finditer(buf, 0, region):
+                    q_start, q_end = match.span()
+                    unterminated = q_end == region
+                    if not unterminated and buf.find(b"\n", q_start, q_end) == -1:
+                        continue  # campo entre aspas sem quebra de linha: não muda as fronteiras
+                    nl = buf.rfind(b"\n", i, q_start)
+                    if nl != -1:
+                        yield buf, base, i, nl + 1
+                        record_start = nl + 1
+                    if unterminated:
+                        # O registro continua no próximo bloco: relido a partir do seu início
+                        keep = record_start
+                        break
+                    i = q_end
+                else:
+                    if i < region:
+                        yield buf, base, i, region
+            carry = buf[keep:]
+            base += keep
+
+
+# Linhas vazias ("\n" ou "\r\n"), que csv.reader devolve como [] e os engines descartam
+_BLANK_LINE = re.compile(rb"^\r?\n", re.MULTILINE)
+
+
+def count_records(buf: bytes, i: int, j: int) -> int:
+    """Registros não vazios em um trecho de iter_record_ends (ou em parte dele, a partir de um início de linha).
+
+    A última linha física de um registro com várias linhas tem aspas, então nunca é uma linha vazia.
+    """
+    records = buf.count(b"\n", i, j)
+    if buf.startswith((b"\n", b"\r\n"), i, j) or buf.find(b"\n\n", i, j) != -1 or buf.find(b"\n\r\n", i, j) != -1:
+        records -= len(_BLANK_LINE.findall(buf, i, j))
+    return records
+
+
+def find_record_boundaries(path: Path, start: int, targets: Iterable[int], delimiter: str = ",") -> List[int]:
+    """Para cada offset em ``targets``, acha o início do primeiro registro CSV a partir dele.
+
+    Varre os bytes a partir de ``start`` (que deve ser início de registro) com iter_record_ends, só
+    até o último alvo; campos com quebras de linha internas nunca são cortados. Offsets
+    repetidos são descartados.
+    """
+    boundaries: List[int] = []
+    pending = iter(sorted(targets))
+    target = next(pending, None)
+    if target is None:
+        return boundaries
+    for buf, base, i, j in iter_record_ends(path, start, delimiter=delimiter):
+        while target is not None:
+            nl = buf.find(b"\n", max(i, target - base), j)
+            if nl == -1:
+                break
+            boundaries.append(base + nl + 1)
+            while target is not None and target <= base + nl + 1:
+                target = next(pending, None)
+        if target is None:
+            break
+    return boundaries
+
+
+def last_record_boundary(path: Path, start: int, end: int, delimiter: str = ",") -> int:
+    """Fim do último registro completo em [start, end): o offset logo após a última quebra de
+    linha fora de campo entre aspas, ou ``start`` se não houver nenhuma.
+
+    ``start`` deve ser início de registro. As aspas seguem as regras do csv (iter_record_ends);
+    um registro sem quebra de linha final ou com um campo entre aspas ainda aberto (arquivo
+    sendo gravado) fica de fora.
+    """
+    last = start
+    for _, base, _, j in iter_record_ends(path, start, end, delimiter):
+        last = base + j
+    return last
+
+
+def stratified_sample(
+    path: Path, encoding: str, delimiter: str, width: int, strata: int = SAMPLE_STRATA, max_rows: int = HEAD_ROWS
+) -> List[List[str]]:
+    """Até ``max_rows`` registros (listas de campos) de pontos equidistantes do corpo do arquivo.
+
+    As primeiras linhas são um retrato enviesado de arquivos ordenados (ex.: por clínica), então
+    a amostra vem de ``strata`` offsets espaçados igualmente entre o fim do cabeçalho e o fim do
+    arquivo. Em cada ponto a linha cortada é descartada (ressincroniza na quebra de linha seguinte)
+    e só registros com ``width`` campos entram, o que também descarta pedaços de campos entre aspas
+    com quebra de linha interna. Lê O(strata) blocos de até SAMPLE_STRATUM_BYTES, nunca o arquivo
+    inteiro; um bloco só cresce além disso quando não chega ao fim da primeira linha inteira
+    (linhas mais longas que o bloco, como em arquivos com milhares de colunas).
+    """
+    data_start = find_record_boundaries(path, 0, [0], delimiter)
+    if not data_start:
+        return []  # só cabeçalho
+    start = data_start[0]
+    size = path.stat().st_size
+    strata = max(1, min(strata, (size - start) // SAMPLE_MIN_SPACING))
+    offsets = [start + (size - start) * i // strata for i in range(strata)] + [size]
+    per_stratum = -(-max_rows // strata)
+    codec = bom_free_encoding(encoding)
+    rows: List[List[str]] = []
+    with path.open("rb") as f:
+        for offset, next_offset in zip(offsets, offsets[1:]):
+            f.seek(offset)
+            chunk = f.read(min(SAMPLE_STRATUM_BYTES, next_offset - offset))
+            # Quebras de linha necessárias para haver uma linha inteira (a primeira pode estar cortada)
+            needed = 1 if offset == start else 2
+            while chunk.count(b"\n") < needed:
+                more = f.read(len(chunk))  # dobra o bloco: linhas enormes custam O(log n) leituras
+                if not more:
+                    break
+                chunk += more
+            at_eof = offset + len(chunk) >= size
+            if offset != start:
+                cut = chunk.find(b"\n")
+                chunk = chunk[cut + 1:] if cut != -1 else b""
+            if not at_eof:
+                chunk = chunk[: chunk.rfind(b"\n") + 1]  # a última linha pode estar cortada
+            reader = csv.reader(io.StringIO(chunk.decode(codec, "replace"), newline=""), delimiter=delimiter)
+            rows.extend(islice((row for row in reader if len(row) == width), per_stratum))
+    return rows[:max_rows]
+
+
+def split_byte_ranges(
+    path: Path, start: int, parts: int, end: Optional[int] = None, delimiter: str = ","
+) -> List[Tuple[int, int, int]]:
+    """Divide [start, end) (padrão: até o fim do arquivo) em até ``parts`` faixas alinhadas em
+    fronteiras de registro.
+
+    Devolve ``(início, fim, registros não vazios)`` por faixa; a contagem permite conferir se o
+    csv leu em cada faixa os mesmos registros que a varredura encontrou.
+    """
+    size = path.stat().st_size if end is None else end
+    if start >= size:
+        return []
+    step = (size - start) / parts
+    targets = deque(start + int(step * k) for k in range(1, parts))
+    edges = [start]
+    counts: List[int] = []
+    count = 0
+    last = start  # fim do último registro terminado em quebra de linha
+    for buf, base, i, j in iter_record_ends(path, start, size, delimiter):
+        while targets:
+            nl = buf.find(b"\n", max(i, targets[0] - base), j)
+            if nl == -1:
+                break
+            cut = base + nl + 1
+            count += count_records(buf, i, nl + 1)
+            i = nl + 1
+            while targets and targets[0] <= cut:
+                targets.popleft()
+            if cut < size:
+                edges.append(cut)
+                counts.append(count)
+                count = 0
+        count += count_records(buf, i, j)
+        last = base + j
+    if last < size:
+        count += 1  # último registro sem quebra de linha
+    edges.append(size)
+    counts.append(count)
+    return list(zip(edges[:-1], edges[1:], counts))
+
+
+def is_ascii_compatible(encoding: str, delimiter: str) -> bool:
+    """Quebras de linha, aspas e delimitador precisam ser os mesmos bytes ASCII para dividir o arquivo."""
+    try:
+        encoded = ('\n"' + delimiter).encode(encoding)
+    except (LookupError, UnicodeError):
+        return False
+    return encoded.endswith(b'\n"' + delimiter.encode("ascii"))
+
+
+def process_byte_range(
+    path: str, start: int, end: int, config: PipelineConfig
+) -> Tuple[Union[str, bytes], int, int]:
+    """Processa os registros em [start, end) do arquivo. Executado nos processos de trabalho.
+
+    Retorna (CSV de saída sem cabeçalho, linhas processadas, linhas inválidas); a saída vem
+    em bytes para os engines de RAW_ENGINES e em texto para os demais.
+    """
+    stats = RunStats()
+    raw = config.engine in RAW_ENGINES
+    out: IO = io.BytesIO() if raw else io.StringIO()
+    with open(path, "rb") as f:
+        if config.use_mmap:
+            # Cada worker mapeia o arquivo e percorre só a sua faixa, sem copiá-la inteira
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                write_body(mapped_body_rows(mm, start, end, config), out, config, stats)
+        else:
+            f.seek(start)
+            data = io.BytesIO(f.read(end - start))
+            src: IO = data if raw else io.TextIOWrapper(data, encoding=config.encoding, newline="")
+            write_body(iter_body_rows(src, config), out, config, stats)
+    return out.getvalue(), stats.total, stats.errors
+
+
+def run_parallel(
+    in_path: Path,
+    out: IO,
+    config: PipelineConfig,
+    workers: int,
+    stats: RunStats,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+) -> None:
+    """Processa o corpo do CSV em paralelo e grava os resultados em ``out`` na ordem original.
+
+    O arquivo é dividido em faixas de bytes alinhadas em registros (PARALLEL_CHUNK_BYTES cada, no
+    mínimo uma por worker); no máximo 2 faixas por worker ficam pendentes por vez, limitando a memória.
+    ``start``/``end`` restringem o processamento a [start, end) (``start`` deve ser início de
+    registro); por padrão, do fim do cabeçalho ao fim do arquivo.
+
+    Cada faixa tem que render no csv tantos registros quantos a divisão contou nela; se não render,
+    o corte não coincide com uma fronteira de registro do csv, e dessa faixa em diante o arquivo é
+    processado aqui mesmo, em sequência (com um aviso).
+    """
+    if start is None:
+        data_start = find_record_boundaries(in_path, 0, [0], config.delimiter)
+        if not data_start:
+            return  # só cabeçalho
+        start = data_start[0]
+    size = in_path.stat().st_size if end is None else end
+    parts = max(workers, math.ceil((size - start) / PARALLEL_CHUNK_BYTES))
+    ranges = split_byte_ranges(in_path, start, parts, size, config.delimiter)
+
+    def drain(item: Tuple[int, int, Future]) -> Optional[int]:
+        """Grava o resultado da faixa; devolve o início dela se a contagem não bater (nada é gravado)."""
+        range_start, expected, future = item
+        text, total, errors = future.result()
+        if total != expected:
+            return range_start
+        out.write(text)
+        stats.total += total
+        stats.errors += errors
+        return None
+
+    # Import tardio: concurrent.futures.process pesa na inicialização de quem roda com 1 worker
+    from concurrent.futures import ProcessPoolExecutor
+
+    resume: Optional[int] = None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Tuple[int, int, Future]] = deque()
+        for range_start, range_end, expected in ranges:
+            future = pool.submit(process_byte_range, str(in_path), range_start, range_end, config)
+            pending.append((range_start, expected, future))
+            if len(pending) >= 2 * workers:
+                resume = drain(pending.popleft())
+                if resume is not None:
+                    break
+        while resume is None and pending:
+            resume = drain(pending.popleft())
+        for _, _, future in pending:
+            future.cancel()
+    if resume is not None:
+        print(
+            f"Aviso: {in_path}: a divisão em faixas não coincidiu com os registros lidos pelo csv a partir "
+            f"do byte {resume}; o restante foi processado em um único processo.",
+            file=sys.stderr,
+        )
+        with in_path.open("rb") as f:
+            write_body(decoded_body_rows(iter_file_lines(f, resume, size), config), out, config, stats)
+
+
+def _profiled_parallel(
+    profiler: StageProfiler,
+    in_path: Path,
+    out: IO,
+    config: PipelineConfig,
+    workers: int,
+    stats: RunStats,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+) -> None:
+    """run_parallel com o tempo atribuído à etapa "parallel" (a CPU medida é só a do processo principal)."""
+    before = stats.total
+    with profiler.stage("parallel"):
+        run_parallel(in_path, out, config, workers, stats, start=start, end=end)
+    profiler.count("parallel", stats.total - before)
+
+
+def default_cache_dir() -> Path:
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV])
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "imc_csv"
+
+
+def _code_fingerprint() -> List[List[object]]:
+    """Nome, tamanho e mtime deste script e dos módulos de imc_core (faixas, rótulos, codecs):
+    editar qualquer um deles invalida as saídas em cache."""
+    files = [Path(__file__)] + sorted(Path(imc_core.__file__).parent.glob("*.py"))
+    return [[f.name, f.stat().st_size, f.stat().st_mtime_ns] for f in files]
+
+
+@dataclass(frozen=True)
+class ResultCache:
+    """Cache em disco das saídas já calculadas, com descarte LRU por tamanho total.
+
+    A chave combina a identidade da entrada (tamanho + mtime + caminho, ou o sha256 do conteúdo
+    com ``by_content``), as opções que influenciam a saída e a versão deste script e de imc_core. Cada entrada
+    é ``<chave>.out`` (a saída) + ``<chave>.json`` (contadores e formato detectado); o mtime da
+    saída marca o último uso.
+    """
+
+    root: Path
+    max_bytes: int = CACHE_MAX_BYTES
+    by_content: bool = False
+
+    def key(self, in_path: Path, out_path: Path, options: RunOptions) -> str:
+        st = in_path.stat()
+        if self.by_content:
+            digest = hashlib.sha256()
+            with in_path.open("rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            identity: Dict[str, object] = {"sha256": digest.hexdigest()}
         else:
-            # Se altura parecer estar em cm, converte para m
-            if h > 3:  # heurística simples
-                h = h / 100.0
+            identity = {"path": str(in_path.resolve()), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        material = {
+            "version": CACHE_VERSION,
+            "code": _code_fingerprint(),
+            "input": identity,
+            "parquet": is_parquet(in_path),
+            "output_compression": compression_from_suffix(out_path),
+            "options": _output_options(options),
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def fetch(self, key: str, in_path: Path, out_path: Path, started: float) -> Optional[FileResult]:
+        """Copia a saída em cache para ``out_path``; None se a chave não estiver no cache."""
+        data = self.root / f"{key}.out"
+        try:
+            meta = json.loads((self.root / f"{key}.json").read_text(encoding="utf-8"))
+            shutil.copyfile(data, out_path)
+            os.utime(data)
+        except (OSError, ValueError):
+            return None
+        config = PipelineConfig(**{k: tuple(v) if isinstance(v, list) else v for k, v in meta["config"].items()})
+        return FileResult(
+            in_path=in_path,
+            out_path=out_path,
+            config=config,
+            stats=RunStats(total=meta["rows"], errors=meta["errors"]),
+            elapsed=time.perf_counter() - started,
+            size=in_path.stat().st_size,
+            cached=True,
+        )
+
+    def store(self, key: str, result: FileResult) -> None:
+        """Guarda a saída de ``result`` (gravação atômica) e descarta as entradas menos usadas.
+
+        Saídas maiores que ``max_bytes`` não são guardadas: a cópia seria descartada logo em
+        seguida pelo evict, depois de custar uma segunda gravação completa da saída.
+        """
+        if result.out_path.stat().st_size > self.max_bytes:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        meta = {"rows": result.stats.total, "errors": result.stats.errors, "config": asdict(result.config)}
+        for name, write in (
+            (f"{key}.json", lambda tmp: tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")),
+            (f"{key}.out", lambda tmp: shutil.copyfile(result.out_path, tmp)),
+        ):
+            tmp = self.root / f"{name}.{os.getpid()}.tmp"
+            write(tmp)
+            os.replace(tmp, self.root / name)
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for data in self.root.glob("*.out"):
             try:
-                bmi_value = w / (h * h)
-            except Exception:
-                errors += 1
-        if bmi_value is not None and bmi_value > 0 and math.isfinite(bmi_value):
-            category = categorize_bmi(bmi_value)
-            row["imc"] = f"{bmi_value:.2f}"
+                st = data.stat()
+            except FileNotFoundError:
+                continue  # descartada por outro processo
+            entries.append((st.st_mtime_ns, st.st_size, data))
+        total = sum(size for _, size, _ in entries)
+        for _, size, data in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            data.unlink(missing_ok=True)
+            data.with_suffix(".json").unlink(missing_ok=True)
+            total -= size
+
+
+@dataclass(frozen=True)
+class SchemaRegistry:
+    """Registro persistente dos formatos já detectados, um por layout de origem.
+
+    Cada sistema de origem exporta sempre o mesmo cabeçalho, então a chave é o sha256 do
+    cabeçalho bruto (primeiro registro, sem BOM e terminador de linha) + encoding. Um arquivo
+    com cabeçalho já visto reutiliza delimitador, decimal e colunas de peso/altura sem rodar a
+    detecção; cabeçalhos novos são detectados e registrados. Cada layout é ``<chave>.json``
+    em ``root`` (gravação atômica, seguro com vários processos).
+    """
+
+    root: Path
+
+    def key(self, in_path: Path, encoding: str) -> str:
+        with open_input(in_path) as f:
+            header, _ = split_terminator(next(iter_raw_records(f), b""))
+        if header.startswith(codecs.BOM_UTF8):
+            header = header[len(codecs.BOM_UTF8):]
+        digest = hashlib.sha256(codecs.lookup(encoding).name.encode("ascii") + b"\0" + header)
+        return digest.hexdigest()
+
+    def lookup(self, key: str) -> Optional[DetectedLayout]:
+        """Layout registrado para a chave; None se ausente ou ilegível (será detectado de novo)."""
+        try:
+            entry = json.loads((self.root / f"{key}.json").read_text(encoding="utf-8"))
+            if entry.get("version") != SCHEMA_VERSION:
+                return None
+            return DetectedLayout(**entry["layout"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def store(self, key: str, layout: DetectedLayout, fieldnames: Sequence[str]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        # O cabeçalho vai junto só para quem inspecionar o registro saber de que layout se trata
+        entry = {"version": SCHEMA_VERSION, "layout": asdict(layout), "fieldnames": list(fieldnames)}
+        tmp = self.root / f"{key}.json.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(entry, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self.root / f"{key}.json")
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    """Opções da linha de comando aplicadas a cada arquivo processado."""
+
+    peso_col: Optional[str] = None
+    altura_col: Optional[str] = None
+    delimiter: Optional[str] = None
+    decimal: Optional[str] = None
+    decimal_out: str = "."
+    encoding: str = "utf-8-sig"
+    engine: str = "python"
+    workers: int = 1
+    use_mmap: bool = False
+    keep_columns: Optional[Tuple[str, ...]] = None  # Parquet: colunas mantidas além de peso/altura
+    incremental: bool = False
+    cache: Optional[ResultCache] = None
+    codec_thread: bool = False  # entrada/saída comprimida: codec em uma thread separada
+    schemas: Optional[SchemaRegistry] = None
+    profile: bool = False  # mede tempo e linhas por etapa (FileResult.profile)
+
+
+@dataclass
+class FileResult:
+    """Resultado do processamento de um arquivo."""
+
+    in_path: Path
+    out_path: Path
+    config: PipelineConfig
+    stats: RunStats
+    elapsed: float
+    size: int
+    resumed_from: Optional[int] = None  # modo incremental: offset a partir do qual as linhas foram acrescentadas
+    cached: bool = False  # saída copiada do cache de resultados
+    known_layout: bool = False  # formato lido do registro de layouts, sem detecção
+    profile: Optional[StageProfiler] = None  # tempos por etapa, com RunOptions.profile
+
+
+def is_parquet(path: Path) -> bool:
+    return path.suffix.lower() in PARQUET_SUFFIXES
+
+
+def default_output_path(in_path: Path, out_dir: Optional[Path] = None) -> Path:
+    """entrada.csv -> entrada_com_imc.csv; a extensão de compressão é mantida (entrada.csv.gz ->
+    entrada_com_imc.csv.gz)."""
+    if is_parquet(in_path):
+        name = in_path.stem + PARQUET_OUTPUT_SUFFIX
+    else:
+        base = strip_compression_suffix(in_path)
+        name = base.stem + OUTPUT_SUFFIX + in_path.name[len(base.name):]
+    return (out_dir / name) if out_dir else in_path.with_name(name)
+
+
+def _write_raw(
+    in_path: Path,
+    out_path: Path,
+    config: PipelineConfig,
+    workers: int,
+    stats: RunStats,
+    codec_thread: bool = False,
+    profiler: StageProfiler = _NO_PROFILE,
+) -> None:
+    """Caminho binário dos engines de RAW_ENGINES: cabeçalho original + nomes das colunas novas."""
+    with open_input(in_path, codec_thread) as f:
+        records = iter_raw_records(f, config.delimiter.encode("ascii"))
+        header, term = split_terminator(next(records, b""))
+        bom = b""
+        if codecs.lookup(config.encoding).name == "utf-8-sig":
+            # Mesmo comportamento da escrita em texto: BOM sempre presente na saída
+            bom = codecs.BOM_UTF8
+            if header.startswith(bom):
+                header = header[len(bom):]
+        if term:
+            config = replace(config, line_terminator=term.decode("ascii"))
+        delim = config.delimiter.encode("ascii")
+        with open_output(out_path, codec_thread) as out:
+            out.write(bom + header + delim + b"imc" + delim + b"categoria_imc" + (term or b"\r\n"))
+            if workers > 1:
+                _profiled_parallel(profiler, in_path, out, config, workers, stats)
+            elif config.use_mmap:
+                write_mapped_body(in_path, out, config, stats, profiler)
+            else:
+                write_body(records, out, config, stats, profiler)
+
+
+def process_parquet(in_path: Path, out_path: Path, options: RunOptions) -> FileResult:
+    """Versão Parquet de process_file.
+
+    Lê só as colunas de peso/altura e as de identificação do paciente (``options.keep_columns``
+    ou find_patient_columns), em lotes de NUMPY_BATCH_ROWS linhas, e grava cada lote enriquecido
+    como um row group do Parquet de saída; a memória fica limitada a um lote. "imc" é gravado
+    como float (arredondado a 2 casas) e, como "categoria_imc", fica nulo em linhas inválidas.
+    """
+    started = time.perf_counter()
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise CsvInputError("Entrada/saída Parquet requer o pacote pyarrow (pip install pyarrow).") from None
+    if not is_parquet(out_path):
+        raise CsvInputError(f"A saída de uma entrada Parquet também deve ser Parquet: {out_path}")
+
+    try:
+        source = pq.ParquetFile(in_path)
+    except pa.ArrowException as exc:
+        raise CsvInputError(f"Não foi possível ler o Parquet: {exc}") from None
+    fieldnames = source.schema_arrow.names
+    weight_col, height_col = resolve_weight_height(fieldnames, options.peso_col, options.altura_col)
+    keep = options.keep_columns if options.keep_columns is not None else find_patient_columns(fieldnames)
+    missing = [c for c in keep if c not in fieldnames]
+    if missing:
+        raise CsvInputError(f"Colunas inexistentes no Parquet: {missing}\nColunas disponíveis: {fieldnames}")
+    wanted = set(keep) | {weight_col, height_col}
+    projection = [name for name in fieldnames if name in wanted]
+    out_fields = projection + [extra for extra in ("imc", "categoria_imc") if extra not in projection]
+
+    batches = source.iter_batches(batch_size=NUMPY_BATCH_ROWS, columns=projection)
+    first = next(batches, None)
+    if options.decimal:
+        decimal_in = options.decimal
+    elif first is not None:
+        decimal_in = decide_decimal(first.slice(0, HEAD_ROWS).to_pylist(), [weight_col, height_col])
+    else:
+        decimal_in = "."
+
+    config = PipelineConfig(
+        encoding=options.encoding,
+        delimiter="",
+        fieldnames=tuple(fieldnames),
+        out_fields=tuple(out_fields),
+        weight_col=weight_col,
+        height_col=height_col,
+        decimal_in=decimal_in,
+        engine="python",
+    )
+    stats = RunStats()
+    parse = make_number_parser(decimal_in)
+    writer = None
+    try:
+        for batch in chain([first], batches) if first is not None else ():
+            imcs: List[Optional[float]] = []
+            categories: List[Optional[str]] = []
+            for w, h in zip(batch.column(weight_col).to_pylist(), batch.column(height_col).to_pylist()):
+                imc, category, valid = bmi_cells(w, h, parse)
+                stats.total += 1
+                if not valid:
+                    stats.errors += 1
+                imcs.append(float(imc) if imc else None)
+                categories.append(category or None)
+            table = pa.Table.from_batches([batch])
+            new_columns = (("imc", pa.array(imcs, pa.float64())), ("categoria_imc", pa.array(categories, pa.string())))
+            for name, values in new_columns:
+                if name in table.column_names:
+                    table = table.set_column(table.column_names.index(name), name, values)
+                else:
+                    table = table.append_column(name, values)
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, table.schema)
+            writer.write_table(table)
+        if writer is None:
+            # Parquet sem linhas: ainda assim gera a saída com as colunas novas
+            schema = source.schema_arrow
+            fields = [schema.field(name) for name in projection]
+            new_fields = [pa.field("imc", pa.float64()), pa.field("categoria_imc", pa.string())]
+            fields += [f for f in new_fields if f.name not in projection]
+            pq.write_table(pa.schema(fields).empty_table(), out_path)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return FileResult(
+        in_path=in_path,
+        out_path=out_path,
+        config=config,
+        stats=stats,
+        elapsed=time.perf_counter() - started,
+        size=in_path.stat().st_size,
+    )
+
+
+def manifest_path(out_path: Path) -> Path:
+    return out_path.with_name(out_path.name + MANIFEST_SUFFIX)
+
+
+def _output_options(options: RunOptions) -> Dict[str, object]:
+    """Opções que influenciam o conteúdo da saída (workers e mmap não mudam o resultado)."""
+    skip = ("workers", "use_mmap", "incremental", "cache", "codec_thread", "schemas", "profile")
+    return {k: v for k, v in asdict(options).items() if k not in skip}
+
+
+def header_digest(path: Path) -> str:
+    """sha256 do primeiro registro (cabeçalho) do arquivo."""
+    with path.open("rb") as f:
+        return hashlib.sha256(next(iter_raw_records(f), b"")).hexdigest()
+
+
+def prefix_digest(path: Path, offset: int) -> str:
+    """Impressão digital de [0, offset): sha256 do tamanho e dos FINGERPRINT_BYTES iniciais e finais.
+
+    Custa O(1) leituras em vez de O(arquivo); detecta arquivos substituídos, truncados ou com
+    o fim reescrito, que é o que importa para uma entrada append-only.
+    """
+    digest = hashlib.sha256(str(offset).encode("ascii"))
+    with path.open("rb") as f:
+        digest.update(f.read(min(offset, FINGERPRINT_BYTES)))
+        tail = max(FINGERPRINT_BYTES, offset - FINGERPRINT_BYTES)
+        if tail < offset:
+            f.seek(tail)
+            digest.update(f.read(offset - tail))
+    return digest.hexdigest()
+
+
+def save_manifest(
+    result: FileResult, options: RunOptions, offset: int, rows: int, errors: int, complete: bool = True
+) -> None:
+    """Grava (de forma atômica) o manifesto com o estado do que já foi processado.
+
+    ``complete`` indica que ``offset`` é fronteira de registro (nada de um registro pela metade
+    foi processado); se não for, a próxima execução reprocessa o arquivo inteiro.
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "offset": offset,
+        "rows": rows,
+        "errors": errors,
+        "complete": complete,
+        "header_sha256": header_digest(result.in_path),
+        "prefix_sha256": prefix_digest(result.in_path, offset),
+        "options": _output_options(options),
+        "config": asdict(result.config),
+        "output_size": result.out_path.stat().st_size,
+    }
+    target = manifest_path(result.out_path)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, target)
+
+
+def load_resumable_manifest(in_path: Path, out_path: Path, options: RunOptions) -> Optional[dict]:
+    """Manifesto da execução anterior, se ela puder ser continuada; senão None (com um aviso
+    explicando por que o arquivo será reprocessado por inteiro)."""
+    try:
+        manifest = json.loads(manifest_path(out_path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None  # primeira execução
+    except (OSError, ValueError) as exc:
+        reason = f"manifesto ilegível ({exc})"
+    else:
+        size = in_path.stat().st_size
+        offset = manifest.get("offset", -1) if manifest.get("version") == MANIFEST_VERSION else -1
+        if offset < 0:
+            reason = "manifesto de outra versão"
+        elif manifest.get("options") != json.loads(json.dumps(_output_options(options))):
+            reason = "opções diferentes da execução anterior"
+        elif not out_path.exists() or out_path.stat().st_size != manifest.get("output_size"):
+            reason = "arquivo de saída ausente ou alterado"
+        elif size < offset:
+            reason = "entrada menor que na execução anterior"
+        elif manifest.get("header_sha256") != header_digest(in_path):
+            reason = "cabeçalho alterado"
+        elif manifest.get("prefix_sha256") != prefix_digest(in_path, offset):
+            reason = "conteúdo já processado foi alterado"
+        elif size > offset and not manifest.get("complete"):
+            reason = "a execução anterior terminou em um registro incompleto"
         else:
-            row["imc"] = ""
-        row["categoria_imc"] = category
-        enriched.append(row)
-    return enriched, errors
+            return manifest
+    print(f"Aviso: {in_path}: {reason}; reprocessando o arquivo inteiro.", file=sys.stderr)
+    return None
 
 
-def decide_decimal(rows: List[Dict[str, str]], candidates: List[str]) -> str:
-    # Coleta uma amostra de valores das colunas relevantes para detecção
-    values: List[str] = []
-    for row in rows[:200]:
-        for c in candidates:
-            v = row.get(c)
-            if v:
-                values.append(str(v))
-    if not values:
-        return "."
-    return detect_decimal_from_values(values)
+def append_new_records(
+    in_path: Path,
+    out_path: Path,
+    config: PipelineConfig,
+    start: int,
+    end: int,
+    workers: int,
+    stats: RunStats,
+    profiler: StageProfiler = _NO_PROFILE,
+) -> None:
+    """Processa os registros em [start, end) da entrada e os acrescenta ao fim da saída."""
+    if config.engine in RAW_ENGINES:
+        with in_path.open("rb") as f:
+            _, term = split_terminator(next(iter_raw_records(f, config.delimiter.encode("ascii")), b""))
+        if term:
+            config = replace(config, line_terminator=term.decode("ascii"))
+        out_ctx: IO = out_path.open("ab")
+    else:
+        # Em modo "a" o TextIOWrapper não repete o BOM de utf-8-sig no meio do arquivo
+        out_ctx = out_path.open("a", encoding=config.encoding, newline="")
+    with out_ctx as out:
+        if workers > 1:
+            _profiled_parallel(profiler, in_path, out, config, workers, stats, start=start, end=end)
+        elif config.use_mmap:
+            with in_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                write_body(mapped_body_rows(mm, start, end, config), out, config, stats, profiler)
+        else:
+            with in_path.open("rb") as f:
+                write_body(decoded_body_rows(iter_file_lines(f, start, end), config), out, config, stats, profiler)
 
 
-def main(argv: Optional[List[str]] = None) -> int:
-    parser = argparse.ArgumentParser(description="Calcula IMC a partir de um CSV.")
-    parser.add_argument("input", help="Caminho do CSV de entrada")
-    parser.add_argument("-o", "--output", help="Caminho do CSV de saída (padrão: <input>_com_imc.csv)")
-    parser.add_argument("--peso-col", help="Nome exato da coluna de peso (kg)")
-    parser.add_argument("--altura-col", help="Nome exato da coluna de altura (m)")
-    parser.add_argument("--delimiter", choices=[",", ";", "\t"], help="Delimitador do CSV")
-    parser.add_argument("--decimal", choices=[",", "."], help="Separador decimal de entrada")
-    parser.add_argument("--saida-decimal", choices=[",", "."], default=".", help="Separador decimal para IMC na saída")
-    parser.add_argument("--encoding", default="utf-8-sig", help="Encoding do arquivo (padrão: utf-8-sig)")
+def process_incremental(
+    in_path: Path, out_path: Path, options: RunOptions, profiler: StageProfiler = _NO_PROFILE
+) -> FileResult:
+    """Modo incremental de process_file para entradas append-only.
 
-    args = parser.parse_args(argv)
+    Com um manifesto válido da execução anterior (mesmas opções, cabeçalho e trecho já processado
+    inalterados, saída intacta), só os registros após o offset salvo são processados e acrescentados
+    à saída existente, sem repetir a detecção; caso contrário o arquivo é processado por inteiro.
+    O manifesto é atualizado ao final.
+    """
+    started = time.perf_counter()
+    size = in_path.stat().st_size
+    with profiler.stage("manifest"):
+        manifest = load_resumable_manifest(in_path, out_path, options)
+    if manifest is None:
+        result = process_file(in_path, out_path, replace(options, incremental=False, cache=None), profiler)
+        if in_path.stat().st_size != size:
+            print(
+                f"Aviso: {in_path} mudou durante o processamento; a próxima execução será completa.",
+                file=sys.stderr,
+            )
+            manifest_path(out_path).unlink(missing_ok=True)
+        else:
+            with profiler.stage("manifest"):
+                # A execução completa processa até o fim do arquivo, inclusive um registro final pela metade
+                complete = last_record_boundary(in_path, 0, size, result.config.delimiter) == size
+                save_manifest(result, options, size, result.stats.total, result.stats.errors, complete)
+            if not complete:
+                print(
+                    f"Aviso: {in_path}: o arquivo termina em um registro incompleto (sem quebra de linha "
+                    "ou com aspas abertas); a próxima execução incremental reprocessará o arquivo inteiro.",
+                    file=sys.stderr,
+                )
+        return result
 
-    in_path = Path(args.input)
+    saved = manifest["config"]
+    config = PipelineConfig(
+        **{k: tuple(v) if isinstance(v, list) else v for k, v in saved.items()}
+    )
+    config = replace(config, use_mmap=options.use_mmap)
+    stats = RunStats()
+    offset = manifest["offset"]
+    # Só registros completos: um registro final sem quebra de linha ou com aspas abertas (ainda sendo
+    # gravado) fica para a próxima execução, que o lê inteiro a partir do novo offset
+    with profiler.stage("manifest"):
+        end = last_record_boundary(in_path, offset, size, config.delimiter)
+    if end < size:
+        print(
+            f"Aviso: {in_path}: o último registro está incompleto (sem quebra de linha ou com aspas abertas); "
+            "ele será processado na próxima execução.",
+            file=sys.stderr,
+        )
+    if end > offset:
+        append_new_records(in_path, out_path, config, offset, end, max(1, options.workers), stats, profiler)
+    result = FileResult(
+        in_path=in_path,
+        out_path=out_path,
+        config=config,
+        stats=stats,
+        elapsed=time.perf_counter() - started,
+        size=end - offset,
+        resumed_from=offset,
+    )
+    with profiler.stage("manifest"):
+        save_manifest(result, options, end, manifest["rows"] + stats.total, manifest["errors"] + stats.errors)
+    return result
+
+
+def process_file(
+    in_path: Path, out_path: Path, options: RunOptions, profiler: Optional[StageProfiler] = None
+) -> FileResult:
+    """Detecta o formato, calcula o IMC e grava a saída de um único CSV.
+
+    Com ``options.profile``, o resultado traz os tempos por etapa em ``FileResult.profile``;
+    ``profiler`` é o perfil em andamento, repassado pelas chamadas internas (cache, incremental).
+    Levanta CsvInputError quando o arquivo não pode ser processado.
+    """
+    if profiler is None:
+        if options.profile:
+            profiler = StageProfiler()
+            result = process_file(in_path, out_path, options, profiler)
+            result.profile = profiler.finish()
+            return result
+        profiler = _NO_PROFILE
+    started = time.perf_counter()
     if not in_path.exists():
-        print(f"Arquivo de entrada não encontrado: {in_path}", file=sys.stderr)
-        return 2
+        raise CsvInputError(f"Arquivo de entrada não encontrado: {in_path}")
+    compression = None if is_parquet(in_path) else detect_compression(in_path)
+    try:
+        require_codec(compression)
+        require_codec(compression_from_suffix(out_path))
+    except CodecUnavailableError as exc:
+        raise CsvInputError(str(exc)) from None
+    cache = options.cache if not options.incremental else None
+    if cache is not None:
+        before = in_path.stat()
+        with profiler.stage("cache"):
+            key = cache.key(in_path, out_path, options)
+            cached = cache.fetch(key, in_path, out_path, started)
+        if cached is not None:
+            return cached
+        result = process_file(in_path, out_path, replace(options, cache=None), profiler)
+        after = in_path.stat()
+        if (before.st_size, before.st_mtime_ns) == (after.st_size, after.st_mtime_ns):
+            # Só guarda se a entrada não mudou durante o processamento; falha no cache não derruba a execução
+            try:
+                with profiler.stage("cache"):
+                    cache.store(key, result)
+            except OSError as exc:
+                print(f"Aviso: não foi possível gravar no cache {cache.root}: {exc}", file=sys.stderr)
+        return result
+    if is_parquet(in_path):
+        with profiler.stage("parquet"):
+            result = process_parquet(in_path, out_path, options)
+        profiler.count("parquet", result.stats.total)
+        return result
+    if compression and (options.workers > 1 or options.use_mmap or options.incremental):
+        # Fluxo comprimido não tem offsets de bytes: sem faixas por worker, mmap ou retomada
+        print(
+            f"Aviso: {in_path} está comprimido ({compression}); usando 1 worker, sem --mmap e sem --incremental.",
+            file=sys.stderr,
+        )
+        options = replace(options, workers=1, use_mmap=False, incremental=False)
+    if options.incremental and compression_from_suffix(out_path):
+        print(f"Aviso: a saída {out_path} é comprimida; --incremental ignorado.", file=sys.stderr)
+        options = replace(options, incremental=False)
+    if options.incremental:
+        if is_ascii_compatible(options.encoding, options.delimiter or ","):
+            return process_incremental(in_path, out_path, options, profiler)
+        print(
+            f"Aviso: encoding '{options.encoding}' não permite retomar por offset de bytes; processando tudo.",
+            file=sys.stderr,
+        )
+
+    with profiler.stage("sniff"):
+        # Layout já registrado (mesmo cabeçalho): reaproveita a detecção feita para ele
+        registry = options.schemas
+        schema_key = registry.key(in_path, options.encoding) if registry is not None else None
+        layout = registry.lookup(schema_key) if schema_key is not None else None
+        if layout is not None and options.delimiter and options.delimiter != layout.delimiter:
+            # Outro delimitador muda a leitura das colunas: o layout registrado não se aplica
+            layout = None
+
+        # Lê só um prefixo limitado do arquivo para detectar o delimitador
+        delimiter = options.delimiter or (
+            layout.delimiter if layout else detect_delimiter(read_sample(in_path, options.encoding))
+        )
+
+    ascii_compatible = is_ascii_compatible(options.encoding, delimiter)
+    workers = max(1, options.workers)
+    if workers > 1 and not ascii_compatible:
+        print(
+            f"Aviso: encoding '{options.encoding}' não permite dividir o arquivo por bytes; usando 1 worker.",
+            file=sys.stderr,
+        )
+        workers = 1
+    use_mmap = options.use_mmap
+    if use_mmap and not ascii_compatible:
+        print(
+            f"Aviso: encoding '{options.encoding}' não permite ler via mmap; usando leitura normal.",
+            file=sys.stderr,
+        )
+        use_mmap = False
+    engine = options.engine
+    if engine in RAW_ENGINES and not ascii_compatible:
+        print(
+            f"Aviso: encoding '{options.encoding}' não permite o engine '{engine}'; usando 'positional'.",
+            file=sys.stderr,
+        )
+        engine = "positional"
+
+    # Processamento em streaming: leitura -> parse -> enriquecimento -> escrita, uma linha por vez.
+    # A detecção usa uma amostra estratificada lida à parte; só quando ela não é possível as primeiras
+    # HEAD_ROWS linhas ficam em memória (para detecção) e são reinjetadas no fluxo.
+    positional = engine in POSITIONAL_ENGINES or engine in RAW_ENGINES
+    with io.TextIOWrapper(open_input(in_path, options.codec_thread), encoding=options.encoding, newline="") as f:
+        with profiler.stage("read"):
+            if positional:
+                reader = csv.reader(f, delimiter=delimiter)
+                fieldnames = next(reader, [])
+                body: Iterator = (row for row in reader if row)
+            else:
+                # restkey evita chaves None quando há colunas extras em alguma linha
+                body = csv.DictReader(f, delimiter=delimiter, restkey="_rest")
+                fieldnames = body.fieldnames or []
+
+        if not fieldnames:
+            raise CsvInputError("Não foi possível ler o cabeçalho do CSV.")
 
-    out_path = Path(args.output) if args.output else in_path.with_name(in_path.stem + "_com_imc.csv")
+        with profiler.stage("detect"):
+            # Determina colunas de peso/altura
+            weight_col, height_col = resolve_weight_height(fieldnames, options.peso_col, options.altura_col, layout)
 
-    # Lê cabeçalho e amostra para detecção
-    sample_text = in_path.read_text(encoding=args.encoding, errors="ignore")[:5000]
+            # Detecta separador decimal (se não fornecido) e unidade da altura
+            head: List = []
+            sample_rows: List[Dict[str, str]] = []
+            if layout is not None:
+                decimal_in = options.decimal or layout.decimal_in
+                height_unit = layout.height_unit
+            else:
+                if compression is None and ascii_compatible:
+                    # Amostra espalhada pelo arquivo, lida por seek; o fluxo principal não é tocado
+                    sampled = stratified_sample(in_path, options.encoding, delimiter, len(fieldnames))
+                    sample_rows = [dict(zip(fieldnames, row)) for row in sampled]
+                if not has_decimal_evidence(sample_rows, [weight_col, height_col]):
+                    # Sem amostra por seek, ou uma amostra sem nenhum decimal: as primeiras linhas
+                    # vêm antes dela (decide_decimal só olha HEAD_ROWS linhas)
+                    head = list(islice(body, HEAD_ROWS))
+                    sample_rows = ([dict(zip(fieldnames, row)) for row in head] if positional else head) + sample_rows
+                profiler.count("detect", len(sample_rows))
+                decimal_in = options.decimal or decide_decimal(sample_rows, [weight_col, height_col])
+                height_unit = detect_height_unit((row.get(height_col) for row in sample_rows), decimal_in)
 
-    delimiter = args.delimiter or detect_delimiter(sample_text)
+            # Só registra o que foi de fato detectado: opções da linha de comando e o "." padrão de uma
+            # amostra sem decimais valeriam, em silêncio, para todo arquivo futuro com o mesmo cabeçalho
+            overridden = options.delimiter or options.decimal or options.peso_col or options.altura_col
+            if (
+                schema_key is not None
+                and layout is None
+                and not overridden
+                and has_decimal_evidence(sample_rows, [weight_col, height_col])
+            ):
+                try:
+                    detected = DetectedLayout(delimiter, decimal_in, weight_col, height_col, height_unit)
+                    registry.store(schema_key, detected, fieldnames)
+                except OSError as exc:
+                    print(
+                        f"Aviso: não foi possível gravar no registro de layouts {registry.root}: {exc}",
+                        file=sys.stderr,
+                    )
 
-    # Lê todas as linhas em memória para facilitar detecções e processamento
-    with in_path.open("r", encoding=args.encoding, newline="") as f:
-        # restkey evita chaves None quando há colunas extras em alguma linha
-        reader = csv.DictReader(f, delimiter=delimiter, restkey="_rest")
-        rows = list(reader)
-        fieldnames = reader.fieldnames or []
+        # Prepara cabeçalho de saída: mantém ordem original + novas colunas (se não existirem)
+        out_fields = list(fieldnames)
+        for extra in ("imc", "categoria_imc"):
+            if extra not in out_fields:
+                out_fields.append(extra)
 
-    if not fieldnames:
-        print("Não foi possível ler o cabeçalho do CSV.", file=sys.stderr)
+        if engine in RAW_ENGINES and len(out_fields) != len(fieldnames) + 2:
+            # O repasse só acrescenta colunas; sobrescrever "imc" existente exige reescrever a linha
+            print(
+                f"Aviso: o CSV já tem coluna 'imc'/'categoria_imc'; usando engine 'positional' em vez de '{engine}'.",
+                file=sys.stderr,
+            )
+            engine = "positional"
+
+        config = PipelineConfig(
+            encoding=options.encoding,
+            delimiter=delimiter,
+            fieldnames=tuple(fieldnames),
+            out_fields=tuple(out_fields),
+            weight_col=weight_col,
+            height_col=height_col,
+            decimal_in=decimal_in,
+            decimal_out=options.decimal_out,
+            engine=engine,
+            use_mmap=use_mmap,
+            height_unit=height_unit,
+        )
+        stats = RunStats()
+
+        if engine in RAW_ENGINES:
+            del head
+            _write_raw(in_path, out_path, config, workers, stats, options.codec_thread, profiler)
+            return FileResult(
+                in_path=in_path,
+                out_path=out_path,
+                config=config,
+                stats=stats,
+                elapsed=time.perf_counter() - started,
+                size=in_path.stat().st_size,
+                known_layout=layout is not None,
+            )
+
+        with io.TextIOWrapper(open_output(out_path, options.codec_thread), encoding=options.encoding, newline="") as out:
+            csv.DictWriter(out, fieldnames=out_fields, delimiter=delimiter).writeheader()
+            if workers > 1:
+                # Os workers releem o corpo do arquivo por faixas de bytes; o buffer inicial só serviu à detecção
+                del head
+                _profiled_parallel(profiler, in_path, out, config, workers, stats)
+            elif config.use_mmap:
+                del head
+                write_mapped_body(in_path, out, config, stats, profiler)
+            else:
+                rows = chain(head, body)
+                del head
+                write_body(rows, out, config, stats, profiler)
+
+    return FileResult(
+        in_path=in_path,
+        out_path=out_path,
+        config=config,
+        stats=stats,
+        elapsed=time.perf_counter() - started,
+        size=in_path.stat().st_size,
+        known_layout=layout is not None,
+    )
+
+
+def _has_glob(pattern: str) -> bool:
+    return any(ch in pattern for ch in "*?[")
+
+
+def expand_inputs(inputs: Iterable[str]) -> List[Path]:
+    """Expande diretórios (*.csv, *.csv.gz/.bz2/.zst e *.parquet) e padrões glob em uma lista
+    ordenada e sem repetições.
+
+    Arquivos de saída gerados pelo próprio script (*_com_imc.csv/.parquet, comprimidos ou não) são
+    ignorados nas expansões.
+    """
+    generated = (OUTPUT_SUFFIX, PARQUET_OUTPUT_SUFFIX)
+    files: List[Path] = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            found = sorted(
+                p for p in path.iterdir() if strip_compression_suffix(p).suffix == ".csv" or p.suffix in PARQUET_SUFFIXES
+            )
+        elif _has_glob(item):
+            found = sorted(Path(p) for p in glob.glob(item, recursive=True))
+        else:
+            files.append(path)
+            continue
+        files.extend(p for p in found if p.is_file() and not strip_compression_suffix(p).name.endswith(generated))
+    return list(dict.fromkeys(files))
+
+
+def run_batch(inputs: List[str], out_dir: Optional[Path], options: RunOptions) -> int:
+    """Processa vários arquivos em um único processo Python, com um pool de ``options.workers``
+    processos compartilhado entre os arquivos (cada arquivo é uma tarefa)."""
+    files = expand_inputs(inputs)
+    if not files:
+        print(f"Nenhum arquivo CSV encontrado em: {' '.join(inputs)}", file=sys.stderr)
+        return 2
+    if out_dir:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [(f, default_output_path(f, out_dir)) for f in files]
+    outputs = [o for _, o in jobs]
+    if len(set(outputs)) != len(outputs):
+        print("Mais de um arquivo de entrada geraria a mesma saída; ajuste os nomes ou o -o.", file=sys.stderr)
         return 2
 
-    # Determina colunas de peso/altura
-    weight_col = args.peso_col
-    height_col = args.altura_col
-    if not weight_col or not height_col:
-        auto_w, auto_h = find_weight_height_columns(fieldnames)
-        weight_col = weight_col or auto_w
-        height_col = height_col or auto_h
+    # Dentro do lote o paralelismo é por arquivo; cada arquivo roda sem dividir em faixas
+    file_options = replace(options, workers=1)
+    started = time.perf_counter()
+    failures = 0
+    total_rows = 0
+    total_bytes = 0
+    profile = StageProfiler() if options.profile else None
 
-    if not weight_col or not height_col:
+    def report(in_path: Path, outcome: Callable[[], FileResult]) -> None:
+        nonlocal failures, total_rows, total_bytes
+        try:
+            result = outcome()
+        except (CsvInputError, OSError, UnicodeError, csv.Error) as exc:
+            failures += 1
+            print(f"{in_path}: ERRO: {exc}", file=sys.stderr)
+            return
+        total_rows += result.stats.total
+        total_bytes += result.size
+        if profile is not None and result.profile is not None:
+            profile.merge(result.profile)
+        rate = result.stats.total / result.elapsed if result.elapsed > 0 else 0.0
+        novas = " novas" if result.resumed_from is not None else ""
+        origem = " (cache)" if result.cached else " (layout conhecido)" if result.known_layout else ""
         print(
-            "Não foi possível identificar as colunas de peso e altura. "
-            "Informe-as com --peso-col e --altura-col.",
-            file=sys.stderr,
+            f"{in_path}: {result.stats.total} linhas{novas}, {result.stats.errors} inválidas, "
+            f"{result.elapsed:.2f}s ({rate:.0f} linhas/s) -> {result.out_path}{origem}"
         )
-        print(f"Colunas disponíveis: {fieldnames}")
-        return 2
 
-    # Detecta separador decimal se não fornecido
-    decimal_in = args.decimal or decide_decimal(rows, [weight_col, height_col])
+    if options.workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=options.workers) as pool:
+            futures = [(i, pool.submit(process_file, i, o, file_options)) for i, o in jobs]
+            for in_path, future in futures:
+                report(in_path, future.result)
+    else:
+        for in_path, out_path in jobs:
+            report(in_path, lambda: process_file(in_path, out_path, file_options))
 
-    # Calcula IMC
-    enriched_rows, error_count = compute_bmi_for_rows(rows, weight_col, height_col, decimal_in)
+    elapsed = time.perf_counter() - started
+    rate = total_rows / elapsed if elapsed > 0 else 0.0
+    mb_rate = total_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Arquivos: {len(jobs)} (falhas: {failures}). Linhas: {total_rows} em {elapsed:.2f}s "
+        f"({rate:.0f} linhas/s, {mb_rate:.1f} MB/s)."
+    )
+    if profile is not None:
+        # Com --workers os arquivos rodam em paralelo: a soma dos tempos passa do tempo de parede do lote
+        print_profile(profile)
+    return 2 if failures else 0
 
-    # Prepara cabeçalho de saída: mantém ordem original + novas colunas (se não existirem)
-    out_fields = list(fieldnames)
-    for extra in ("imc", "categoria_imc"):
-        if extra not in out_fields:
-            out_fields.append(extra)
 
-    # Escreve saída
-    with out_path.open("w", encoding=args.encoding, newline="") as f:
-        # extrasaction='ignore' garante que chaves desconhecidas (ex.: '_rest') não causem erro
-        writer = csv.DictWriter(
-            f, fieldnames=out_fields, delimiter=delimiter, extrasaction="ignore"
+def print_profile(profile: StageProfiler) -> None:
+    print("Tempo por etapa (--profile):")
+    for line in profile.report():
+        print(f"  {line}")
+
+
+def run_cli(args: argparse.Namespace, options: RunOptions) -> int:
+    """Executa a linha de comando já interpretada por ``main``: um arquivo ou um lote."""
+    batch = len(args.input) > 1 or any(Path(i).is_dir() or _has_glob(i) for i in args.input)
+    if batch:
+        return run_batch(args.input, Path(args.output) if args.output else None, options)
+
+    in_path = Path(args.input[0])
+    out_path = Path(args.output) if args.output else default_output_path(in_path)
+    try:
+        result = process_file(in_path, out_path, options)
+    except CsvInputError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+
+    stats = result.stats
+    config = result.config
+    if is_parquet(in_path):
+        print(
+            f"Processadas {stats.total} linhas. Sucesso: {stats.ok}. Com dados inválidos: {stats.errors}.\n"
+            f"Arquivo gerado: {out_path} (colunas={list(config.out_fields)}, decimal_in='{config.decimal_in}')."
         )
-        writer.writeheader()
-        for row in enriched_rows:
-            # Ajusta decimal de saída, se necessário
-            if args.saida_decimal == "," and row.get("imc"):
-                row = dict(row)
-                row["imc"] = row["imc"].replace(".", ",")
-            writer.writerow(row)
-
-    total = len(enriched_rows)
-    ok = total - error_count
+        if result.profile is not None:
+            print_profile(result.profile)
+        return 0
+    if result.cached:
+        print("Resultado copiado do cache (mesma entrada e mesmas opções de uma execução anterior).")
+    if result.known_layout:
+        print("Layout conhecido: delimitador, decimal e colunas vieram do registro de layouts, sem detecção.")
+    if result.resumed_from is not None:
+        print(f"Modo incremental: {stats.total} linhas novas a partir do byte {result.resumed_from}.")
     print(
-        f"Processadas {total} linhas. Sucesso: {ok}. Com dados inválidos: {error_count}.\n"
-        f"Arquivo gerado: {out_path} (delimitador='{delimiter}', decimal_in='{decimal_in}', decimal_out='{args.saida_decimal}')."
+        f"Processadas {stats.total} linhas. Sucesso: {stats.ok}. Com dados inválidos: {stats.errors}.\n"
+        f"Arquivo gerado: {out_path} (delimitador='{config.delimiter}', decimal_in='{config.decimal_in}', decimal_out='{config.decimal_out}')."
     )
+    if config.height_unit:
+        print(f"Unidade das alturas na amostra: {config.height_unit} (convertidas valor a valor quando em cm).")
+    if result.profile is not None:
+        print_profile(result.profile)
     return 0
 
 
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Calcula IMC a partir de um CSV.")
+    parser.add_argument(
+        "input",
+        nargs="+",
+        help=(
+            "CSV (também .csv.gz/.bz2/.zst) ou Parquet de entrada; aceita vários arquivos, "
+            "diretórios (*.csv, *.parquet) e padrões glob"
+        ),
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help=(
+            "CSV de saída (padrão: <input>_com_imc.csv); .gz/.bz2/.zst grava comprimido; "
+            "em lote, diretório de saída"
+        ),
+    )
+    parser.add_argument("--peso-col", help="Nome exato da coluna de peso (kg)")
+    parser.add_argument("--altura-col", help="Nome exato da coluna de altura (m)")
+    parser.add_argument("--delimiter", choices=[",", ";", "\t"], help="Delimitador do CSV")
+    parser.add_argument("--decimal", choices=[",", "."], help="Separador decimal de entrada")
+    parser.add_argument("--saida-decimal", choices=[",", "."], default=".", help="Separador decimal para IMC na saída")
+    parser.add_argument("--encoding", default="utf-8-sig", help="Encoding do arquivo (padrão: utf-8-sig)")
+    parser.add_argument(
+        "--engine",
+        choices=sorted(list(ENGINES) + list(POSITIONAL_ENGINES) + list(RAW_ENGINES)),
+        default="python",
+        help=(
+            "Engine de cálculo: 'python' (linha a linha), 'numpy' (colunar, em lotes; o mais rápido), "
+            "'positional' (listas em vez de dicts) ou 'passthrough' (copia os bytes originais e só lê "
+            "peso/altura)"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Número de processos: divide o arquivo em faixas de bytes; em lote, arquivos em paralelo (padrão: 1)",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Lê o corpo do arquivo via mmap (arquivos locais): varredura mais rápida e workers sem cópia da faixa",
+    )
+    parser.add_argument(
+        "--colunas",
+        help=(
+            "Entrada Parquet: colunas mantidas na saída além de peso/altura, separadas por vírgula "
+            "(padrão: colunas de identificação do paciente, ex.: 'paciente', 'id', 'nome')"
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Entradas CSV append-only: processa só as linhas novas desde a última execução e as acrescenta "
+            f"à saída (estado em <saída>{MANIFEST_SUFFIX}); reprocessa tudo se o início do arquivo mudou"
+        ),
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=(
+            "Guarda uma cópia da saída no cache de resultados e a reutiliza para entradas e opções já vistas "
+            "(desligado por padrão: a cópia contém os dados dos pacientes)"
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Não usa o cache de resultados (padrão)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=(
+            f"Diretório do cache de resultados e do registro de layouts (padrão: ${CACHE_DIR_ENV}, "
+            "$XDG_CACHE_HOME/imc_csv ou ~/.cache/imc_csv)"
+        ),
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=CACHE_MAX_BYTES // (1024 * 1024),
+        help="Tamanho máximo do cache; as entradas usadas há mais tempo são descartadas (padrão: 1024)",
+    )
+    parser.add_argument(
+        "--cache-conteudo",
+        action="store_true",
+        help="Identifica a entrada pelo sha256 do conteúdo em vez de caminho + tamanho + data de modificação",
+    )
+    parser.add_argument(
+        "--no-schema-registry",
+        action="store_true",
+        help=(
+            "Não usa o registro de layouts (por padrão, arquivos com um cabeçalho já visto reutilizam "
+            "delimitador, decimal e colunas detectados antes, sem repetir a detecção)"
+        ),
+    )
+    parser.add_argument(
+        "--schema-dir",
+        help=f"Diretório do registro de layouts (padrão: <diretório do cache>/{SCHEMA_DIR_NAME})",
+    )
+    parser.add_argument(
+        "--codec-thread",
+        action="store_true",
+        help="Entrada/saída comprimida (.gz, .bz2, .zst): roda a (des)compressão em uma thread separada do cálculo",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Ao final, mostra tempo de parede, tempo de CPU e linhas/s por etapa "
+            "(sniff, read, detect, compute, write); a medição por linha deixa a execução mais lenta"
+        ),
+    )
+    parser.add_argument(
+        "--profile-out",
+        metavar="ARQ",
+        help="Implica --profile e grava também um perfil cProfile em ARQ (leia com: python -m pstats ARQ)",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.engine == "numpy":
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            print("O engine 'numpy' requer o pacote numpy (pip install numpy).", file=sys.stderr)
+            return 2
+
+    options = RunOptions(
+        peso_col=args.peso_col,
+        altura_col=args.altura_col,
+        delimiter=args.delimiter,
+        decimal=args.decimal,
+        decimal_out=args.saida_decimal,
+        encoding=args.encoding,
+        engine=args.engine,
+        workers=args.workers,
+        use_mmap=args.mmap,
+        keep_columns=None if args.colunas is None else tuple(c.strip() for c in args.colunas.split(",") if c.strip()),
+        incremental=args.incremental,
+        cache=None
+        if not args.cache
+        else ResultCache(
+            root=Path(args.cache_dir) if args.cache_dir else default_cache_dir(),
+            max_bytes=args.cache_max_mb * 1024 * 1024,
+            by_content=args.cache_conteudo,
+        ),
+        codec_thread=args.codec_thread,
+        schemas=None
+        if args.no_schema_registry
+        else SchemaRegistry(
+            root=Path(args.schema_dir)
+            if args.schema_dir
+            else (Path(args.cache_dir) if args.cache_dir else default_cache_dir()) / SCHEMA_DIR_NAME
+        ),
+        profile=args.profile or bool(args.profile_out),
+    )
+
+    if not args.profile_out:
+        return run_cli(args, options)
+    import cProfile
+
+    # Só o processo principal é perfilado; os processos de --workers não aparecem no arquivo
+    cprofile = cProfile.Profile()
+    try:
+        return cprofile.runcall(run_cli, args, options)
+    finally:
+        cprofile.dump_stats(args.profile_out)
+        print(f"Perfil cProfile gravado em {args.profile_out} (leia com: python -m pstats {args.profile_out}).")
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
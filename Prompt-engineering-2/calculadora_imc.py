@@ -7,9 +7,21 @@ Descrição: Calcula o IMC (Índice de Massa Corporal) para pacientes a partir d
 Uso esperado:
 - Entrada:  'dados_pacientes.csv' no mesmo diretório, com as colunas: paciente, peso, altura
 - Saída:    'resultados_imc.csv' contendo as colunas originais + imc + classificacao
-- Exibição: Imprime uma mensagem de sucesso e as 5 primeiras linhas do arquivo de saída
+- Exibição: Imprime uma mensagem de sucesso e as 5 primeiras linhas do resultado
 
-Requisitos: pandas
+Opções:
+    --chunksize N  Processa o CSV em blocos de N linhas, gravando a saída incrementalmente.
+    --previa N     Linhas exibidas na prévia final (padrão: 5; 0 desativa).
+    --engine E     "pandas" (padrão) ou "arrow" (pyarrow.csv + Arrow compute, multi-thread).
+    --parquet      Lê 'dados_pacientes.parquet' e grava 'resultados_imc.parquet' (requer pyarrow),
+                   só com as colunas paciente, peso e altura, um row group por vez.
+    --entrada/--saida  Outros arquivos de entrada/saída. CSVs comprimidos (gzip, bz2, zstd) são lidos
+                   em fluxo (formato detectado pelos bytes mágicos) e a saída é comprimida conforme a
+                   extensão (ex.: --saida resultados_imc.csv.gz); zstd requer o pacote zstandard.
+    --codec-thread Roda a (des)compressão em uma thread separada do cálculo.
+
+Requisitos: pandas (e numpy, instalado junto com o pandas), carregados só quando o CSV é
+processado; calcular_imc e classificar_imc funcionam sem eles.
 
 Notas:
 - Tratamento simples para o caso do arquivo de entrada não existir.
@@ -17,14 +29,43 @@ Notas:
 """
 from __future__ import annotations
 
+import argparse
+import csv
+import io
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
 
-import pandas as pd
+# Pacote compartilhado imc_core, na raiz do repositório
+_RAIZ_REPO = str(Path(__file__).resolve().parent.parent)
+if _RAIZ_REPO not in sys.path:
+    sys.path.insert(0, _RAIZ_REPO)
+
+from imc_core import classify, compute_bmi  # noqa: E402
+from imc_core.backends import round_like_python  # noqa: E402
+from imc_core.classification import WHO_LABELS_CAPITALIZED, category_index  # noqa: E402
+from imc_core.compression import (  # noqa: E402
+    CodecUnavailableError,
+    compression_from_suffix,
+    detect_compression,
+    open_input,
+    open_output,
+    require_codec,
+)
 
 # Constantes de nomes de arquivos
 INPUT_FILE = Path(__file__).with_name("dados_pacientes.csv")
 OUTPUT_FILE = Path(__file__).with_name("resultados_imc.csv")
+INPUT_PARQUET = Path(__file__).with_name("dados_pacientes.parquet")
+OUTPUT_PARQUET = Path(__file__).with_name("resultados_imc.parquet")
+
+# Colunas lidas da entrada Parquet (projeção: as demais nem são decodificadas)
+COLUNAS_PARQUET = ["paciente", "peso", "altura"]
+# Linhas por lote lido do Parquet quando --chunksize não é informado
+LOTE_PARQUET = 65536
 
 
 def calcular_imc(peso: float, altura: float) -> float:
@@ -49,52 +90,317 @@ def classificar_imc(imc: float) -> str:
     - Obesidade Grau II: 35 <= IMC <= 40
     - Obesidade Grau III: IMC >= 40
     """
-    if pd.isna(imc):
+    if imc is None or imc != imc:  # None ou NaN
         return "Indefinido"
+    return CLASSES_OMS[category_index(imc, upper_inclusive=True)]
+
+
+# Rótulos das faixas da OMS, definidos em imc_core
+CLASSES_OMS = WHO_LABELS_CAPITALIZED
+
+
+def calcular_imc_vetorizado(peso: pd.Series, altura: pd.Series) -> pd.Series:
+    """Versão vetorizada de calcular_imc: opera sobre colunas inteiras de uma vez.
+
+    Mesmo resultado de aplicar calcular_imc linha a linha (altura 0 -> NaN, 1 casa decimal);
+    o cálculo é o do backend pandas de imc_core.
+    """
+    return compute_bmi(peso, altura, decimals=1, backend="pandas")
+
+
+def classificar_imc_vetorizado(imc: pd.Series) -> pd.Series:
+    """Versão vetorizada de classificar_imc, com as mesmas faixas inclusivas da user story.
+
+    Uma única busca binária (searchsorted) por valor na tabela de limites, em vez de uma
+    máscara por faixa (backend pandas de imc_core).
+    """
+    return classify(imc, upper_inclusive=True, labels=CLASSES_OMS, undefined="Indefinido", backend="pandas")
+
+
+def enriquecer(df: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta as colunas 'imc' e 'classificacao' ao DataFrame (no próprio objeto)."""
+    df["imc"] = calcular_imc_vetorizado(df["peso"], df["altura"])
+    df["classificacao"] = classificar_imc_vetorizado(df["imc"])
+    return df
+
+
+def _abrir_saida_texto(saida: Path, codec_thread: bool = False) -> io.TextIOWrapper:
+    """Saída em texto para o to_csv; comprimida conforme a extensão de ``saida``."""
+    return io.TextIOWrapper(open_output(saida, codec_thread), encoding="utf-8", newline="")
+
+
+def _inferir_dtypes(caminho: Path, chunksize: int, codec_thread: bool = False) -> Dict[str, object]:
+    """Primeira passada do modo em blocos: descobre o dtype final de cada coluna.
+
+    Cada bloco é inferido isoladamente pelo pandas (ex.: um bloco só com alturas inteiras
+    viraria int e seria escrito como "2" em vez de "2.0"). Unificando os dtypes de todos os
+    blocos antes, a saída fica idêntica à leitura do arquivo inteiro.
+    """
+    import numpy as np
+    import pandas as pd
+
+    dtypes: Dict[str, object] = {}
+    with open_input(caminho, codec_thread) as f:
+        for bloco in pd.read_csv(f, chunksize=chunksize):
+            for coluna, dtype in bloco.dtypes.items():
+                anterior = dtypes.get(coluna)
+                if anterior is None or anterior == dtype:
+                    dtypes[coluna] = dtype
+                elif anterior.kind in "iuf" and dtype.kind in "iuf":
+                    dtypes[coluna] = np.result_type(anterior, dtype)
+                else:
+                    dtypes[coluna] = np.dtype(object)
+    return dtypes
+
+
+def processar_em_blocos(
+    entrada: Path, saida: Path, chunksize: int, previa: int = 0, codec_thread: bool = False
+) -> Tuple[int, pd.DataFrame]:
+    """Lê, enriquece e grava o CSV em blocos de ``chunksize`` linhas.
+
+    Retorna (total de linhas, primeiras ``previa`` linhas já enriquecidas). A memória fica
+    limitada a um bloco; a saída é byte a byte igual à do processamento do arquivo inteiro
+    (ver _inferir_dtypes). Entrada e saída ficam abertas durante todo o processamento, então
+    uma saída comprimida é um único fluxo.
+    """
+    import pandas as pd
+
+    dtypes = _inferir_dtypes(entrada, chunksize, codec_thread)
+    total = 0
+    primeiro = True
+    partes_previa: List[pd.DataFrame] = []
+    with open_input(entrada, codec_thread) as f, _abrir_saida_texto(saida, codec_thread) as out:
+        for bloco in pd.read_csv(f, chunksize=chunksize, dtype=dtypes):
+            enriquecer(bloco).to_csv(out, index=False, header=primeiro)
+            primeiro = False
+            if total < previa:
+                partes_previa.append(bloco.head(previa - total))
+            total += len(bloco)
+        if primeiro:
+            # Arquivo só com cabeçalho: ainda assim gera a saída com as colunas novas
+            with open_input(entrada) as g:
+                vazio = enriquecer(pd.read_csv(g, dtype=dtypes))
+            vazio.to_csv(out, index=False)
+            partes_previa.append(vazio)
+    return total, pd.concat(partes_previa) if partes_previa else pd.DataFrame()
 
-    if imc <= 18.5:
-        return "Abaixo do peso"
-    if 18.5 <= imc <= 25:
-        return "Peso normal"
-    if 25 <= imc <= 30:
-        return "Sobrepeso"
-    if 30 <= imc <= 35:
-        return "Obesidade Grau I"
-    if 35 <= imc <= 40:
-        return "Obesidade Grau II"
-    return "Obesidade Grau III"
 
+def pyarrow_disponivel() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def enriquecer_arrow(tabela):
+    """Equivalente de enriquecer() para uma pyarrow.Table.
+
+    A divisão é feita com kernels do Arrow compute; o arredondamento e a faixa usam as mesmas
+    funções de imc_core do engine pandas (pc.round não arredonda como o round() do Python em
+    valores como 26.799999999999997), então os valores e as classes são os mesmos nos dois engines.
+    """
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    peso = pc.cast(tabela["peso"], pa.float64())
+    altura = pc.cast(tabela["altura"], pa.float64())
+    # Nulos (peso ou altura ausentes) viram NaN em to_numpy()
+    imc = round_like_python(np, pc.divide(peso, pc.power(altura, 2)).to_numpy(), 1)
+    # Altura 0 -> IMC indefinido (nulo, gravado vazio como o NaN do pandas)
+    imc[altura.to_numpy() == 0] = np.nan
+    classificacao = classify(imc, upper_inclusive=True, labels=CLASSES_OMS, undefined="Indefinido", backend="numpy")
+
+    return tabela.append_column("imc", pa.array(imc, pa.float64(), from_pandas=True)).append_column(
+        "classificacao", pa.array(classificacao, pa.string())
+    )
+
+
+def processar_arrow(
+    entrada: Path, saida: Path, previa: int = 0, codec_thread: bool = False
+) -> Tuple[int, pd.DataFrame]:
+    """Lê com pyarrow.csv (multi-thread), calcula com Arrow compute e grava com o writer do Arrow.
+
+    Os valores são os mesmos do caminho pandas; a formatação segue o Arrow (textos sempre
+    entre aspas e floats inteiros sem ".0", ex.: 2.0 -> 2).
+    """
+    import pyarrow.csv as pa_csv
+
+    with open_input(entrada, codec_thread) as f:
+        tabela = enriquecer_arrow(pa_csv.read_csv(f))
+    with open_output(saida, codec_thread) as out:
+        pa_csv.write_csv(tabela, out)
+    return tabela.num_rows, tabela.slice(0, previa).to_pandas()
+
+
+def processar_parquet(
+    entrada: Path, saida: Path, tamanho_lote: int, engine: str = "pandas", previa: int = 0
+) -> Tuple[int, pd.DataFrame]:
+    """Lê o Parquet em lotes de até ``tamanho_lote`` linhas (só as COLUNAS_PARQUET) e grava
+    cada lote enriquecido como um row group do Parquet de saída.
+
+    A memória fica limitada a um lote. Retorna (total de linhas, primeiras ``previa`` linhas).
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arquivo = pq.ParquetFile(entrada)
+    total = 0
+    partes_previa: List[pd.DataFrame] = []
+    escritor = None
+    try:
+        for lote in arquivo.iter_batches(batch_size=tamanho_lote, columns=COLUNAS_PARQUET):
+            if engine == "arrow":
+                tabela = enriquecer_arrow(pa.Table.from_batches([lote]))
+                if total < previa:
+                    partes_previa.append(tabela.slice(0, previa - total).to_pandas())
+            else:
+                df = enriquecer(lote.to_pandas())
+                tabela = pa.Table.from_pandas(df, preserve_index=False)
+                if total < previa:
+                    partes_previa.append(df.head(previa - total))
+            if escritor is None:
+                escritor = pq.ParquetWriter(saida, tabela.schema)
+            escritor.write_table(tabela)
+            total += tabela.num_rows
+        if escritor is None:
+            # Parquet sem linhas: ainda assim gera a saída com as colunas novas
+            vazio = enriquecer_arrow(arquivo.schema_arrow.empty_table().select(COLUNAS_PARQUET))
+            pq.write_table(vazio, saida)
+            partes_previa.append(vazio.to_pandas())
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return total, pd.concat(partes_previa) if partes_previa else pd.DataFrame()
+
+
+def ler_cabecalho(caminho: Path) -> List[str]:
+    """Nomes das colunas do CSV, lendo só a primeira linha (sem carregar o pandas)."""
+    with io.TextIOWrapper(open_input(caminho), encoding="utf-8-sig", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def _tamanho_bloco(valor: str) -> int:
+    n = int(valor)
+    if n <= 0:
+        raise argparse.ArgumentTypeError("o tamanho do bloco deve ser um inteiro positivo")
+    return n
+
+
+def _tamanho_previa(valor: str) -> int:
+    n = int(valor)
+    if n < 0:
+        raise argparse.ArgumentTypeError("o tamanho da prévia não pode ser negativo")
+    return n
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Calcula o IMC dos pacientes de 'dados_pacientes.csv'.")
+    parser.add_argument(
+        "--chunksize",
+        type=_tamanho_bloco,
+        help="Processa o CSV em blocos de N linhas (memória limitada; saída idêntica); com --parquet, linhas por lote",
+    )
+    parser.add_argument(
+        "--previa",
+        type=_tamanho_previa,
+        default=5,
+        help="Quantidade de linhas exibidas ao final (padrão: 5; 0 desativa, útil em lotes)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["pandas", "arrow"],
+        default="pandas",
+        help="Leitura/cálculo/escrita com pandas (padrão) ou com pyarrow (multi-thread; requer pyarrow)",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Entrada 'dados_pacientes.parquet' e saída 'resultados_imc.parquet' (requer pyarrow)",
+    )
+    parser.add_argument(
+        "--entrada",
+        type=Path,
+        help="Arquivo de entrada (padrão: 'dados_pacientes.csv' ou '.parquet'); aceita CSV .gz, .bz2 e .zst",
+    )
+    parser.add_argument(
+        "--saida",
+        type=Path,
+        help="Arquivo de saída (padrão: 'resultados_imc.csv' ou '.parquet'); .gz, .bz2 ou .zst grava comprimido",
+    )
+    parser.add_argument(
+        "--codec-thread",
+        action="store_true",
+        help="CSV comprimido: roda a (des)compressão em uma thread separada do cálculo",
+    )
+    args = parser.parse_args(argv)
+    if args.engine == "arrow" and args.chunksize and not args.parquet:
+        parser.error("--chunksize só se aplica ao engine 'pandas'")
+    if args.parquet and not pyarrow_disponivel():
+        print("Erro: a opção --parquet requer o pacote pyarrow (pip install pyarrow).")
+        return 2
+    if args.engine == "arrow" and not pyarrow_disponivel():
+        print("Aviso: pyarrow não está instalado; usando o engine 'pandas'.", file=sys.stderr)
+        args.engine = "pandas"
+    entrada, saida = (INPUT_PARQUET, OUTPUT_PARQUET) if args.parquet else (INPUT_FILE, OUTPUT_FILE)
+    entrada = args.entrada or entrada
+    saida = args.saida or saida
 
-def main() -> int:
     # 1) Ler arquivo de entrada com tratamento simples para arquivo não encontrado
-    if not INPUT_FILE.exists():
+    if not entrada.exists():
         print(
-            f"Erro: arquivo de entrada '{INPUT_FILE.name}' não encontrado.\n"
+            f"Erro: arquivo de entrada '{entrada.name}' não encontrado.\n"
             "Certifique-se de que o arquivo existe neste diretório ou gere o arquivo de exemplo."
         )
         return 1
+    if not args.parquet:
+        try:
+            require_codec(detect_compression(entrada))
+            require_codec(compression_from_suffix(saida))
+        except CodecUnavailableError as exc:
+            print(f"Erro: {exc}")
+            return 2
 
-    # 2) Carregar dados com pandas
-    df = pd.read_csv(INPUT_FILE)
+    # 2) Garantir que as colunas esperadas existem (lendo só o cabeçalho/esquema)
+    colunas_esperadas = set(COLUNAS_PARQUET)
+    if args.parquet:
+        import pyarrow.parquet as pq
 
-    # 3) Garantir que as colunas esperadas existem
-    colunas_esperadas = {"paciente", "peso", "altura"}
-    ausentes = colunas_esperadas - set(df.columns)
+        colunas = pq.read_schema(entrada).names
+    else:
+        colunas = ler_cabecalho(entrada)
+    ausentes = colunas_esperadas - set(colunas)
     if ausentes:
-        print(f"Erro: colunas ausentes no CSV de entrada: {sorted(ausentes)}")
+        print(f"Erro: colunas ausentes no {'Parquet' if args.parquet else 'CSV'} de entrada: {sorted(ausentes)}")
         return 2
 
-    # 4) Calcular IMC e classificação
-    df["imc"] = df.apply(lambda r: calcular_imc(r["peso"], r["altura"]), axis=1)
-    df["classificacao"] = df["imc"].apply(classificar_imc)
-
-    # 5) Salvar o resultado em CSV
-    df.to_csv(OUTPUT_FILE, index=False)
+    # 3) Calcular IMC e classificação e salvar o resultado (só aqui o pandas é carregado)
+    try:
+        import pandas as pd
+    except ImportError:
+        print("Erro: o cálculo requer o pacote pandas (pip install -r requirements.txt).")
+        return 2
+    if args.parquet:
+        _, previa = processar_parquet(entrada, saida, args.chunksize or LOTE_PARQUET, args.engine, args.previa)
+    elif args.engine == "arrow":
+        _, previa = processar_arrow(entrada, saida, args.previa, args.codec_thread)
+    elif args.chunksize:
+        _, previa = processar_em_blocos(entrada, saida, args.chunksize, args.previa, args.codec_thread)
+    else:
+        with open_input(entrada, args.codec_thread) as f:
+            df = enriquecer(pd.read_csv(f))
+        with _abrir_saida_texto(saida, args.codec_thread) as out:
+            df.to_csv(out, index=False)
+        previa = df.head(args.previa)
 
-    # 6) Exibir mensagem de sucesso e as 5 primeiras linhas
-    print("Processamento concluído com sucesso. Saída salva em 'resultados_imc.csv'.\n")
-    print("Prévia das 5 primeiras linhas:")
-    print(pd.read_csv(OUTPUT_FILE).head())
+    # 4) Exibir mensagem de sucesso e as primeiras linhas (a partir do resultado em memória,
+    #    sem reler o arquivo de saída)
+    print(f"Processamento concluído com sucesso. Saída salva em '{saida.name}'.\n")
+    if args.previa:
+        print(f"Prévia das {args.previa} primeiras linhas:")
+        print(previa)
 
     return 0
 
@@ -0,0 +1,24 @@
+"""
+Benchmarks dos scripts de IMC.
+
+Os scripts ficam em pastas com hífen no nome (não são pacotes importáveis), então
+este pacote expõe os caminhos e um helper que os coloca no sys.path.
+
+Execute a partir da raiz do repositório, por exemplo:
+    python -m benchmarks.parse_number
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+IMC_CSV_DIR = ROOT / "Prompt-engineering-1"
+CALCULADORA_DIR = ROOT / "Prompt-engineering-2"
+
+
+def add_scripts_to_path() -> None:
+    """Permite `import imc_csv` e `import calculadora_imc` a partir dos benchmarks."""
+    for path in (IMC_CSV_DIR, CALCULADORA_DIR):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
@@ -0,0 +1,68 @@
+"""
+Microbenchmark da API em lote de imc_core: compute_bmi + classify em cada backend.
+
+Uso:
+    python -m benchmarks.backends [--n 1000000] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import random
+import timeit
+from typing import List, Optional, Tuple
+
+from imc_core import BACKENDS, classify, compute_bmi
+
+
+def sample_pairs(n: int, seed: int = 42) -> Tuple[List[float], List[float]]:
+    """Pesos (kg) e alturas (m, algumas em cm), com alguns inválidos."""
+    rng = random.Random(seed)
+    weights = [rng.uniform(40, 150) for _ in range(n)]
+    heights = [rng.uniform(140, 200) if rng.random() < 0.1 else rng.uniform(1.4, 2.0) for _ in range(n)]
+    for i in rng.sample(range(n), n // 100):
+        heights[i] = 0.0
+    return weights, heights
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=1_000_000, help="Pares peso/altura por rodada")
+    parser.add_argument("--repeat", type=int, default=5, help="Rodadas (vale a melhor)")
+    args = parser.parse_args(argv)
+
+    weights, heights = sample_pairs(args.n)
+    inputs = {"python": (weights, heights)}
+    if importlib.util.find_spec("numpy"):
+        import numpy as np
+
+        inputs["numpy"] = (np.array(weights), np.array(heights))
+    if importlib.util.find_spec("pandas"):
+        import pandas as pd
+
+        inputs["pandas"] = (pd.Series(weights), pd.Series(heights))
+
+    def run(name: str):
+        w, h = inputs[name]
+        return classify(compute_bmi(w, h, decimals=1, convert_cm=True, backend=name), backend=name)
+
+    reference = list(run("python"))
+    best = {name: float("inf") for name in inputs}
+    # Rodadas intercaladas para que ruído da máquina afete todos os backends por igual
+    for _ in range(args.repeat):
+        for name in inputs:
+            best[name] = min(best[name], timeit.timeit(lambda: run(name), number=1))
+    for name in inputs:
+        assert list(run(name)) == reference, name
+        print(
+            f"{name:8} {best[name] / args.n * 1e9:8.1f} ns/linha  "
+            f"({best['python'] / best[name]:.1f}x o backend python)"
+        )
+    skipped = sorted(set(BACKENDS) - set(inputs))
+    if skipped:
+        print(f"Sem a dependência instalada: {', '.join(skipped)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,52 @@
+"""
+Compara dois JSONs gerados por ``python -m benchmarks.run``.
+
+Uso:
+    python -m benchmarks.compare antes.json depois.json [--threshold 10]
+
+Sai com código 1 se algum cenário ficou mais lento (linhas/s) além do limite em %.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+def _index(report: Dict) -> Dict[Tuple[str, str], Dict]:
+    return {(r["script"], r["variant"]): r for r in report["results"]}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compara dois resultados de benchmark.")
+    parser.add_argument("before", help="JSON de referência")
+    parser.add_argument("after", help="JSON novo")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regressão tolerada em %% (padrão: 10)")
+    args = parser.parse_args(argv)
+
+    before = json.loads(Path(args.before).read_text(encoding="utf-8"))
+    after = json.loads(Path(args.after).read_text(encoding="utf-8"))
+    if before.get("dataset") != after.get("dataset"):
+        print("Aviso: os datasets das duas execuções são diferentes.")
+
+    old, new = _index(before), _index(after)
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        a, b = old[key], new[key]
+        change = (b["rows_per_s"] / a["rows_per_s"] - 1) * 100 if a["rows_per_s"] else 0.0
+        flag = ""
+        if change < -args.threshold:
+            regressions += 1
+            flag = "  <-- regressão"
+        print(
+            f"{key[0]:16} {key[1]:24} {a['rows_per_s']:12.0f} -> {b['rows_per_s']:12.0f} linhas/s "
+            f"({change:+6.1f}%)  RSS {a['peak_rss_mb']:.1f} -> {b['peak_rss_mb']:.1f} MB{flag}"
+        )
+    for key in sorted(old.keys() ^ new.keys()):
+        print(f"{key[0]:16} {key[1]:24} presente em apenas um dos arquivos")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+"""
+Microbenchmark: parse_number (genérico) x make_number_parser (especializado por decimal).
+
+Uso:
+    python -m benchmarks.parse_number [--n 200000] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+from typing import List, Optional
+
+from imc_core.rows import make_number_parser, parse_number
+
+
+def sample_cells(n: int, decimal: str, seed: int = 42) -> List[str]:
+    """Células típicas de peso/altura: inteiros, decimais, milhar, espaços e inválidos."""
+    rng = random.Random(seed)
+    thousands = "." if decimal == "," else ","
+    cells: List[str] = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.4:
+            cells.append(str(rng.randint(40, 200)))
+        elif r < 0.85:
+            cells.append(f"{rng.uniform(1.4, 2.1):.2f}".replace(".", decimal))
+        elif r < 0.9:
+            cells.append(f"1{thousands}234{decimal}5")
+        elif r < 0.95:
+            cells.append(f" {rng.randint(40, 200)} ")
+        else:
+            cells.append(rng.choice(["", "abc", "n/d"]))
+    return cells
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=200_000, help="Células por rodada")
+    parser.add_argument("--repeat", type=int, default=5, help="Rodadas (vale a melhor)")
+    args = parser.parse_args(argv)
+
+    for decimal in (",", "."):
+        cells = sample_cells(args.n, decimal)
+        fast = make_number_parser(decimal)
+        assert [parse_number(c, decimal) for c in cells] == [fast(c) for c in cells]
+
+        # Rodadas intercaladas para que ruído da máquina afete as duas versões por igual
+        generic = special = float("inf")
+        for _ in range(args.repeat):
+            generic = min(generic, timeit.timeit(lambda: [parse_number(c, decimal) for c in cells], number=1))
+            special = min(special, timeit.timeit(lambda: [fast(c) for c in cells], number=1))
+        print(
+            f"decimal='{decimal}': parse_number {generic / args.n * 1e9:.0f} ns/célula, "
+            f"make_number_parser {special / args.n * 1e9:.0f} ns/célula "
+            f"({generic / special:.2f}x)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
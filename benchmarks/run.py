@@ -0,0 +1,250 @@
+"""
+Benchmark de ponta a ponta dos dois scripts de IMC.
+
+Gera um CSV sintético (ver benchmarks.synthetic), executa cada script/engine em um processo
+novo e mede tempo de parede, tempo de CPU, linhas/s e pico de memória (RSS). O resultado é
+um JSON que pode ser comparado entre execuções com ``python -m benchmarks.compare``.
+
+Com ``--compression gzip zstd`` também mede entrada e saída comprimidas (com e sem
+--codec-thread), para comparar com os cenários sem compressão.
+
+Uso:
+    python -m benchmarks.run --rows 1000000 [--repeat 3] [--workers 4] [--compression gzip] [-o resultado.json]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from imc_core.compression import EXTENSIONS, open_output
+
+from . import CALCULADORA_DIR, IMC_CSV_DIR, ROOT
+from .synthetic import DatasetSpec, write_patients_csv
+
+# calculadora_imc.py lê caminhos fixos; este trecho troca as constantes antes de chamar main()
+_CALCULADORA_SHIM = (
+    "import sys; from pathlib import Path; sys.path.insert(0, sys.argv[1]); "
+    "import calculadora_imc as c; c.INPUT_FILE = Path(sys.argv[2]); c.OUTPUT_FILE = Path(sys.argv[3]); "
+    "raise SystemExit(c.main(sys.argv[4:]))"
+)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    script: str
+    variant: str
+    args: List[str]
+    compression: Optional[str] = None  # entrada e saída comprimidas neste formato
+
+
+@dataclass
+class Measurement:
+    script: str
+    variant: str
+    args: List[str]
+    rows: int
+    wall_s: float
+    cpu_s: float
+    rows_per_s: float
+    peak_rss_mb: float
+    returncode: int
+
+
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def build_scenarios(
+    spec: DatasetSpec, workers: int, chunksize: int, compressions: Sequence[str] = ()
+) -> List[Scenario]:
+    scenarios = [
+        Scenario("imc_csv", "python", ["--engine", "python"]),
+        Scenario("imc_csv", "positional", ["--engine", "positional"]),
+        Scenario("imc_csv", "passthrough", ["--engine", "passthrough"]),
+        Scenario("imc_csv", "passthrough-mmap", ["--engine", "passthrough", "--mmap"]),
+    ]
+    if _has_module("numpy"):
+        scenarios.append(Scenario("imc_csv", "numpy", ["--engine", "numpy"]))
+    if workers > 1:
+        scenarios.append(Scenario("imc_csv", f"python-workers{workers}", ["--workers", str(workers)]))
+    # calculadora_imc.py só lê CSV padrão do pandas (",", decimal ".") e, pela user story,
+    # não trata dados inválidos
+    calculadora = _has_module("pandas") and spec.delimiter == "," and spec.decimal == "." and not spec.invalid_ratio
+    if calculadora:
+        scenarios.append(Scenario("calculadora_imc", "pandas", ["--previa", "0"]))
+        scenarios.append(
+            Scenario("calculadora_imc", f"pandas-chunksize{chunksize}", ["--previa", "0", "--chunksize", str(chunksize)])
+        )
+        if _has_module("pyarrow"):
+            scenarios.append(Scenario("calculadora_imc", "arrow", ["--previa", "0", "--engine", "arrow"]))
+    for codec in compressions:
+        for thread in ([], ["--codec-thread"]):
+            suffix = f"-{codec}" + ("-thread" if thread else "")
+            scenarios.append(Scenario("imc_csv", f"positional{suffix}", ["--engine", "positional"] + thread, codec))
+            if calculadora:
+                scenarios.append(Scenario("calculadora_imc", f"pandas{suffix}", ["--previa", "0"] + thread, codec))
+    return scenarios
+
+
+def compressed_copy(input_path: Path, codec: str) -> Path:
+    """Grava ``input_path`` comprimido em ``codec`` ao lado do original (ex.: pacientes.csv.gz)."""
+    target = input_path.with_name(input_path.name + EXTENSIONS[codec])
+    with input_path.open("rb") as src, open_output(target) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    return target
+
+
+def _command(scenario: Scenario, input_path: Path, output_path: Path) -> List[str]:
+    if scenario.script == "imc_csv":
+        # --no-cache (já é o padrão): as repetições precisam medir o processamento, não a cópia do cache
+        cmd = [sys.executable, str(IMC_CSV_DIR / "imc_csv.py"), str(input_path), "-o", str(output_path), "--no-cache"]
+        return cmd + scenario.args
+    return [sys.executable, "-c", _CALCULADORA_SHIM, str(CALCULADORA_DIR), str(input_path), str(output_path)] + scenario.args
+
+
+def measure(cmd: List[str]) -> Dict[str, float]:
+    """Executa ``cmd`` e devolve tempo de parede, CPU e pico de RSS (MB) apenas desse processo."""
+    # stderr vai para um arquivo: com um pipe que ninguém lê durante o wait4, o filho travaria
+    # ao encher o buffer do pipe (~64 KiB de avisos)
+    with tempfile.TemporaryFile() as err:
+        started = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=err)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - started
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode != 0:
+            err.seek(0)
+            sys.stderr.write(err.read().decode(errors="replace"))
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    rss_kb = usage.ru_maxrss / 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    return {
+        "wall_s": wall,
+        "cpu_s": usage.ru_utime + usage.ru_stime,
+        "peak_rss_mb": rss_kb / 1024,
+        "returncode": proc.returncode,
+    }
+
+
+def run_scenario(scenario: Scenario, input_path: Path, workdir: Path, rows: int, repeat: int) -> Measurement:
+    extension = EXTENSIONS[scenario.compression] if scenario.compression else ""
+    output_path = workdir / f"{scenario.script}-{scenario.variant}.csv{extension}"
+    runs = [measure(_command(scenario, input_path, output_path)) for _ in range(repeat)]
+    best = min(runs, key=lambda r: r["wall_s"])
+    return Measurement(
+        script=scenario.script,
+        variant=scenario.variant,
+        args=scenario.args,
+        rows=rows,
+        wall_s=round(best["wall_s"], 4),
+        cpu_s=round(best["cpu_s"], 4),
+        rows_per_s=round(rows / best["wall_s"], 1) if best["wall_s"] > 0 else 0.0,
+        peak_rss_mb=round(max(r["peak_rss_mb"] for r in runs), 1),
+        returncode=max(int(r["returncode"]) for r in runs),
+    )
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dos scripts de IMC com CSV sintético.")
+    parser.add_argument("--rows", type=int, default=DatasetSpec.rows)
+    parser.add_argument("--columns", type=int, default=DatasetSpec.columns)
+    parser.add_argument("--delimiter", choices=[",", ";", "\t"], default=DatasetSpec.delimiter)
+    parser.add_argument("--decimal", choices=[",", "."], default=DatasetSpec.decimal)
+    parser.add_argument("--cm-ratio", type=float, default=DatasetSpec.cm_ratio)
+    parser.add_argument("--invalid-ratio", type=float, default=DatasetSpec.invalid_ratio)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por cenário (vale a mais rápida)")
+    parser.add_argument("--workers", type=int, default=1, help="Também mede imc_csv.py --workers N")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Bloco do cenário calculadora_imc --chunksize")
+    parser.add_argument("--only", choices=["imc_csv", "calculadora_imc"], help="Mede apenas um dos scripts")
+    parser.add_argument(
+        "--compression",
+        nargs="+",
+        choices=sorted(EXTENSIONS),
+        default=[],
+        help="Também mede entrada/saída comprimidas nesses formatos (zstd requer zstandard)",
+    )
+    parser.add_argument("-o", "--output", help="Arquivo JSON de resultados (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    spec = DatasetSpec(
+        rows=args.rows,
+        columns=args.columns,
+        delimiter=args.delimiter,
+        decimal=args.decimal,
+        cm_ratio=args.cm_ratio,
+        invalid_ratio=args.invalid_ratio,
+        seed=args.seed,
+    )
+    scenarios = [
+        s
+        for s in build_scenarios(spec, args.workers, args.chunksize, args.compression)
+        if args.only in (None, s.script)
+    ]
+
+    with tempfile.TemporaryDirectory(prefix="imc-bench-") as tmp:
+        workdir = Path(tmp)
+        input_path = write_patients_csv(workdir / "pacientes.csv", spec)
+        input_mb = input_path.stat().st_size / (1024 * 1024)
+        inputs = {None: input_path}
+        for codec in args.compression:
+            inputs[codec] = compressed_copy(input_path, codec)
+        compressed_mb = {c: round(p.stat().st_size / (1024 * 1024), 2) for c, p in inputs.items() if c}
+        results = []
+        for scenario in scenarios:
+            m = run_scenario(scenario, inputs[scenario.compression], workdir, spec.rows, args.repeat)
+            results.append(m)
+            status = "" if m.returncode == 0 else f"  FALHOU (rc={m.returncode})"
+            print(
+                f"{m.script:16} {m.variant:24} {m.wall_s:8.2f}s  {m.rows_per_s:12.0f} linhas/s  "
+                f"{m.peak_rss_mb:8.1f} MB{status}",
+                file=sys.stderr,
+            )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "dataset": dict(
+            spec.to_dict(),
+            size_mb=round(input_mb, 2),
+            compressed_mb=compressed_mb,
+        ),
+        "results": [asdict(m) for m in results],
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 1 if any(m.returncode for m in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+"""
+Benchmark de inicialização dos dois scripts de IMC: tempo até a primeira linha e custo dos imports.
+
+Cada cenário roda em um processo novo com um CSV de uma única linha, então o tempo de parede
+é praticamente só a inicialização (interpretador, imports, argparse, detecção do formato) mais
+a primeira linha. Os caminhos de erro (arquivo ausente) e o import das funções escalares de
+calculadora_imc.py também são medidos. Uma execução extra com ``python -X importtime`` mostra
+os módulos que mais pesaram em cada cenário.
+
+Uso:
+    python -m benchmarks.startup [--repeat 10] [--top 5] [--budget-ms 500] [-o startup.json]
+
+Com ``--budget-ms``, sai com código 1 se a mediana de algum cenário passar do limite.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from . import CALCULADORA_DIR, IMC_CSV_DIR
+
+# Entrada mínima aceita pelos dois scripts (colunas detectadas pelo nome)
+SMALL_CSV = "paciente,peso,altura\nAna,70,1.75\n"
+
+_SCALAR_IMPORT = (
+    "import sys; sys.path.insert(0, sys.argv[1]); "
+    "from calculadora_imc import calcular_imc, classificar_imc; classificar_imc(calcular_imc(70, 1.75))"
+)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    script: str
+    variant: str
+    args: List[str]  # argumentos após o executável do Python
+    returncode: int = 0  # código de saída esperado (os caminhos de erro não saem com 0)
+
+
+@dataclass
+class Measurement:
+    script: str
+    variant: str
+    wall_ms_min: float
+    wall_ms_median: float
+    import_ms: float
+    top_imports: List[Tuple[str, float]] = field(default_factory=list)
+    returncode: int = 0
+    expected_returncode: int = 0
+
+
+def build_scenarios(workdir: Path) -> List[Scenario]:
+    small = workdir / "uma_linha.csv"
+    small.write_text(SMALL_CSV, encoding="utf-8")
+    missing = str(workdir / "inexistente.csv")
+    imc_csv = str(IMC_CSV_DIR / "imc_csv.py")
+    calculadora = str(CALCULADORA_DIR / "calculadora_imc.py")
+    scenarios = [
+        Scenario("python", "interpretador", ["-c", "pass"]),
+        Scenario("imc_csv", "primeira-linha", [imc_csv, str(small), "-o", str(workdir / "a.csv"), "--no-cache"]),
+        Scenario("imc_csv", "arquivo-ausente", [imc_csv, missing, "--no-cache"], returncode=2),
+        Scenario("calculadora_imc", "import-escalar", ["-c", _SCALAR_IMPORT, str(CALCULADORA_DIR)]),
+        Scenario("calculadora_imc", "arquivo-ausente", [calculadora, "--entrada", missing], returncode=1),
+    ]
+    if importlib.util.find_spec("pandas"):
+        scenarios.append(
+            Scenario(
+                "calculadora_imc",
+                "primeira-linha",
+                [calculadora, "--entrada", str(small), "--saida", str(workdir / "b.csv"), "--previa", "0"],
+            )
+        )
+    return scenarios
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, float]]:
+    """Imports de primeiro nível (ms acumulados) do relatório de ``-X importtime``, do mais caro ao mais barato.
+
+    Cada linha tem o formato ``import time: <self us> | <cumulative us> | <módulo>``; módulos
+    importados por outros aparecem indentados e já estão contidos no acumulado do pai.
+    """
+    top: List[Tuple[str, float]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # cabeçalho da tabela
+        name = parts[2][1:]  # o primeiro espaço é separador; os demais indicam aninhamento
+        if not name.startswith(" "):
+            top.append((name.strip(), int(parts[1]) / 1000))
+    return sorted(top, key=lambda item: item[1], reverse=True)
+
+
+def run_scenario(scenario: Scenario, repeat: int, top: int) -> Measurement:
+    cmd = [sys.executable] + scenario.args
+    walls = []
+    returncode = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        walls.append((time.perf_counter() - started) * 1000)
+        returncode = proc.returncode
+    report = subprocess.run(
+        [sys.executable, "-X", "importtime"] + scenario.args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    imports = parse_importtime(report.stderr)
+    return Measurement(
+        script=scenario.script,
+        variant=scenario.variant,
+        wall_ms_min=round(min(walls), 1),
+        wall_ms_median=round(statistics.median(walls), 1),
+        import_ms=round(sum(ms for _, ms in imports), 1),
+        top_imports=[(name, round(ms, 1)) for name, ms in imports[:top]],
+        returncode=returncode,
+        expected_returncode=scenario.returncode,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tempo de inicialização e até a primeira linha dos scripts de IMC.")
+    parser.add_argument("--repeat", type=int, default=10, help="Execuções por cenário (padrão: 10)")
+    parser.add_argument("--top", type=int, default=5, help="Imports mais caros listados por cenário (padrão: 5)")
+    parser.add_argument("--budget-ms", type=float, help="Falha se a mediana de algum cenário passar deste limite")
+    parser.add_argument("-o", "--output", help="Arquivo JSON de resultados")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="imc-startup-") as tmp:
+        results = [run_scenario(s, args.repeat, args.top) for s in build_scenarios(Path(tmp))]
+
+    failures = 0
+    for m in results:
+        status = ""
+        if m.returncode != m.expected_returncode:
+            failures += 1
+            status = f"  FALHOU (rc={m.returncode})"
+        elif args.budget_ms is not None and m.wall_ms_median > args.budget_ms:
+            failures += 1
+            status = f"  acima do limite de {args.budget_ms:.0f} ms"
+        print(
+            f"{m.script:16} {m.variant:18} mediana {m.wall_ms_median:7.1f} ms  mín. {m.wall_ms_min:7.1f} ms  "
+            f"imports {m.import_ms:7.1f} ms{status}"
+        )
+        for name, ms in m.top_imports:
+            print(f"{'':36}{ms:8.1f} ms  {name}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "budget_ms": args.budget_ms,
+            },
+            "results": [asdict(m) for m in results],
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+"""
+Gerador de CSVs sintéticos de pacientes para os benchmarks.
+
+Uso:
+    python -m benchmarks.synthetic saida.csv --rows 1000000 [--columns 10] [--delimiter ";"]
+        [--decimal ","] [--cm-ratio 0.2] [--invalid-ratio 0.01] [--messy-ratio 0.05]
+        [--integer-rows 1000] [--seed 42]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Parâmetros do arquivo gerado (também vão para o JSON de resultados)."""
+
+    rows: int = 100_000
+    columns: int = 3  # paciente, peso, altura + colunas extras até completar
+    delimiter: str = ","
+    decimal: str = "."
+    cm_ratio: float = 0.0  # fração de alturas em centímetros
+    invalid_ratio: float = 0.0  # fração de linhas com peso/altura inválidos
+    # Fração de linhas com uma coluna "obs" difícil de dividir: aspas soltas em campo sem aspas,
+    # campo entre aspas com quebra de linha ou com aspas duplicadas (0: sem a coluna)
+    messy_ratio: float = 0.0
+    # Primeiras linhas com peso e altura (em cm) inteiros, como uma exportação ordenada por clínica
+    # em que a primeira clínica não registra casas decimais
+    integer_rows: int = 0
+    seed: int = 42
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+def _number(value: float, digits: int, decimal: str) -> str:
+    text = f"{value:.{digits}f}"
+    return text.replace(".", decimal) if decimal != "." else text
+
+
+def write_patients_csv(path: Path, spec: DatasetSpec) -> Path:
+    """Escreve um CSV com as colunas paciente, peso, altura (+ extra_N) seguindo ``spec``.
+
+    Os nomes de colunas servem tanto para imc_csv.py quanto para calculadora_imc.py
+    (este último só lê arquivos com delimitador "," e decimal ".").
+    """
+    if spec.delimiter == spec.decimal:
+        raise ValueError("delimitador e separador decimal precisam ser diferentes")
+    rng = random.Random(spec.seed)
+    extras = [f"extra_{i}" for i in range(max(0, spec.columns - 3))]
+    header: List[str] = ["paciente", "peso", "altura"] + extras
+    invalid_cells = ["", "n/d", "0"]
+    if spec.messy_ratio:
+        header.append("obs")
+    messy_cells = [
+        'tela 12" ok',
+        '"retorno em 30 dias\nsem restrições"',
+        f'"medido às 8h{spec.delimiter} em jejum\r\nrepetir"',
+        '"diz ""ok"" ao fim"',
+    ]
+    with path.open("w", encoding="utf-8", newline="") as f:
+        f.write(spec.delimiter.join(header) + "\n")
+        for i in range(spec.rows):
+            weight = _number(rng.uniform(40, 160), 1, spec.decimal)
+            if rng.random() < spec.cm_ratio:
+                height = _number(rng.uniform(140, 205), 0, spec.decimal)
+            else:
+                height = _number(rng.uniform(1.40, 2.05), 2, spec.decimal)
+            if i < spec.integer_rows:
+                weight = str(rng.randint(40, 160))
+                height = str(rng.randint(140, 205))
+            if spec.invalid_ratio and rng.random() < spec.invalid_ratio:
+                if rng.random() < 0.5:
+                    weight = rng.choice(invalid_cells)
+                else:
+                    height = rng.choice(invalid_cells)
+            cells = [f"Paciente {i}", weight, height]
+            cells.extend(str(rng.randint(0, 9999)) for _ in extras)
+            if spec.messy_ratio:
+                cells.append(rng.choice(messy_cells) if rng.random() < spec.messy_ratio else "")
+            f.write(spec.delimiter.join(cells) + "\n")
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Gera um CSV sintético de pacientes.")
+    parser.add_argument("output", help="Caminho do CSV gerado")
+    parser.add_argument("--rows", type=int, default=DatasetSpec.rows)
+    parser.add_argument("--columns", type=int, default=DatasetSpec.columns)
+    parser.add_argument("--delimiter", choices=[",", ";", "\t"], default=DatasetSpec.delimiter)
+    parser.add_argument("--decimal", choices=[",", "."], default=DatasetSpec.decimal)
+    parser.add_argument("--cm-ratio", type=float, default=DatasetSpec.cm_ratio)
+    parser.add_argument("--invalid-ratio", type=float, default=DatasetSpec.invalid_ratio)
+    parser.add_argument("--messy-ratio", type=float, default=DatasetSpec.messy_ratio)
+    parser.add_argument("--integer-rows", type=int, default=DatasetSpec.integer_rows)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    args = parser.parse_args(argv)
+
+    spec = DatasetSpec(
+        rows=args.rows,
+        columns=args.columns,
+        delimiter=args.delimiter,
+        decimal=args.decimal,
+        cm_ratio=args.cm_ratio,
+        invalid_ratio=args.invalid_ratio,
+        messy_ratio=args.messy_ratio,
+        integer_rows=args.integer_rows,
+        seed=args.seed,
+    )
+    write_patients_csv(Path(args.output), spec)
+    print(f"Gerado {args.output} ({spec.rows} linhas, {max(spec.columns, 3)} colunas).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
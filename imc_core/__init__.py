@@ -0,0 +1,38 @@
+"""
+Código compartilhado pelos scripts de IMC (Prompt-engineering-1/imc_csv.py e
+Prompt-engineering-2/calculadora_imc.py).
+
+API em lote para outros serviços: ``compute_bmi(weights, heights)`` e ``classify(bmis)``,
+com backends Python puro, NumPy e pandas (ver imc_core.batch e imc_core.backends).
+
+Leitura de CSVs de pacientes: detecção do formato (imc_core.detection) e cálculo linha a
+linha com o engine posicional (imc_core.rows), usados pelo imc_csv.py e pelo imc_core.server.
+
+Os scripts ficam em pastas com hífen no nome e são executados diretamente; cada um
+coloca a raiz do repositório no sys.path para importar este pacote.
+"""
+from __future__ import annotations
+
+from .backends import BACKENDS, Backend, register_backend
+from .batch import classify, compute_bmi, get_backend
+from .classification import (
+    WHO_LABELS,
+    WHO_LABELS_CAPITALIZED,
+    WHO_THRESHOLDS,
+    category_index,
+    category_indices,
+)
+
+__all__ = [
+    "BACKENDS",
+    "Backend",
+    "classify",
+    "compute_bmi",
+    "get_backend",
+    "register_backend",
+    "WHO_LABELS",
+    "WHO_LABELS_CAPITALIZED",
+    "WHO_THRESHOLDS",
+    "category_index",
+    "category_indices",
+]
@@ -0,0 +1,150 @@
+"""
+Backends do cálculo em lote: Python puro, NumPy e pandas.
+
+Todos seguem as mesmas regras, então o resultado é o mesmo em qualquer backend:
+
+- IMC = peso / altura², em ponto flutuante IEEE (altura minúscula -> inf, como no NumPy);
+- peso ou altura ausentes (None/NaN) ou altura 0 -> NaN;
+- ``convert_cm``: alturas acima de 3 são tratadas como centímetros (heurística do imc_csv.py);
+- ``decimals``: arredondamento igual ao round() do Python (inclusive nos empates).
+
+NumPy e pandas só são importados quando o backend correspondente é usado.
+"""
+from __future__ import annotations
+
+import math
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+
+from .classification import WHO_LABELS, category_index, category_indices
+
+
+class Backend(ABC):
+    """Interface de um backend: ``compute_bmi`` e ``classify`` sobre coleções inteiras."""
+
+    name = ""
+
+    @abstractmethod
+    def compute_bmi(self, weights, heights, decimals: Optional[int] = None, convert_cm: bool = False):
+        """IMC de cada par (peso, altura), com as regras descritas no início deste módulo."""
+
+    @abstractmethod
+    def classify(
+        self, bmis, upper_inclusive: bool = False, labels: Sequence[str] = WHO_LABELS, undefined: str = ""
+    ):
+        """Rótulo da faixa de cada IMC; ``undefined`` para NaN/None."""
+
+
+def _bmi_scalar(w: Optional[float], h: Optional[float], decimals: Optional[int], convert_cm: bool) -> float:
+    if w is None or h is None or w != w or h != h or h == 0:
+        return math.nan
+    if convert_cm and h > 3:
+        h = h / 100.0
+    h2 = h * h
+    if h2 == 0:
+        # Underflow: o NumPy devolve ±inf (ou NaN para 0/0); o Python levantaria ZeroDivisionError
+        bmi = math.copysign(math.inf, w) if w else math.nan
+    else:
+        bmi = w / h2
+    if decimals is not None and math.isfinite(bmi):
+        bmi = round(bmi, decimals)
+    return bmi
+
+
+class PythonBackend(Backend):
+    """Listas de floats; sem dependências."""
+
+    name = "python"
+
+    def compute_bmi(self, weights, heights, decimals: Optional[int] = None, convert_cm: bool = False) -> List[float]:
+        return [_bmi_scalar(w, h, decimals, convert_cm) for w, h in zip(weights, heights)]
+
+    def classify(
+        self, bmis, upper_inclusive: bool = False, labels: Sequence[str] = WHO_LABELS, undefined: str = ""
+    ) -> List[str]:
+        return [undefined if b is None or b != b else labels[category_index(b, upper_inclusive)] for b in bmis]
+
+
+def round_like_python(np, values, decimals: int):
+    """np.round com o mesmo resultado do round() do Python (``np`` é o módulo numpy).
+
+    np.round escala por 10**decimals antes de arredondar, o que pode desempatar diferente do
+    round() nos valores que caem exatamente no meio; só esses são refeitos com round().
+    """
+    result = np.round(values, decimals)
+    scale = 10.0 ** decimals
+    with np.errstate(invalid="ignore", over="ignore"):
+        # Acima de 2**52 (já na escala) não há casas a arredondar; np.round perderia precisão
+        large = np.abs(values) * scale >= 2.0 ** 52
+        result[large] = values[large]
+        ties = np.abs(np.abs(values * scale) % 1 - 0.5) < 1e-6
+    if ties.any():
+        result[ties] = [round(float(v), decimals) for v in values[ties]]
+    return result
+
+
+class NumpyBackend(Backend):
+    """Arrays float64 (IMC) e de objetos (rótulos)."""
+
+    name = "numpy"
+
+    def compute_bmi(self, weights, heights, decimals: Optional[int] = None, convert_cm: bool = False):
+        import numpy as np
+
+        w = np.asarray(weights, dtype=float)
+        h = np.asarray(heights, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore", under="ignore"):
+            if convert_cm:
+                h = np.where(h > 3, h / 100.0, h)
+            bmi = w / (h * h)
+        bmi[h == 0] = np.nan
+        if decimals is not None:
+            bmi = round_like_python(np, bmi, decimals)
+        return bmi
+
+    def classify(
+        self, bmis, upper_inclusive: bool = False, labels: Sequence[str] = WHO_LABELS, undefined: str = ""
+    ):
+        import numpy as np
+
+        values = np.asarray(bmis, dtype=float)
+        table = np.array(tuple(labels) + (undefined,), dtype=object)
+        indices = category_indices(np, values, upper_inclusive)
+        indices[np.isnan(values)] = len(labels)
+        return table[indices]
+
+
+class PandasBackend(Backend):
+    """Series do pandas, preservando o índice da primeira coleção (cálculo feito no NumPy)."""
+
+    name = "pandas"
+
+    def compute_bmi(self, weights, heights, decimals: Optional[int] = None, convert_cm: bool = False):
+        import pandas as pd
+
+        weights = weights if isinstance(weights, pd.Series) else pd.Series(weights, dtype=float)
+        bmi = NumpyBackend().compute_bmi(
+            weights.to_numpy(dtype=float), pd.Series(heights).to_numpy(dtype=float), decimals, convert_cm
+        )
+        return pd.Series(bmi, index=weights.index)
+
+    def classify(
+        self, bmis, upper_inclusive: bool = False, labels: Sequence[str] = WHO_LABELS, undefined: str = ""
+    ):
+        import pandas as pd
+
+        bmis = bmis if isinstance(bmis, pd.Series) else pd.Series(bmis, dtype=float)
+        classes = NumpyBackend().classify(bmis.to_numpy(dtype=float), upper_inclusive, labels, undefined)
+        return pd.Series(classes, index=bmis.index, dtype=object)
+
+
+BACKENDS: Dict[str, Backend] = {}
+
+
+def register_backend(backend: Backend) -> None:
+    """Registra (ou substitui) um backend pelo seu ``name``."""
+    BACKENDS[backend.name] = backend
+
+
+for _backend in (PythonBackend(), NumpyBackend(), PandasBackend()):
+    register_backend(_backend)
@@ -0,0 +1,61 @@
+"""
+API em lote: ``compute_bmi(weights, heights)`` e ``classify(bmis)``.
+
+O backend é escolhido pelo nome (ver imc_core.backends.BACKENDS) ou, se omitido, pelo tipo
+da entrada: Series do pandas -> "pandas", array do NumPy -> "numpy", demais iteráveis -> "python".
+
+Exemplo:
+    >>> from imc_core import compute_bmi, classify
+    >>> bmis = compute_bmi([70, 95], [1.75, 1.80], decimals=1)
+    >>> bmis
+    [22.9, 29.3]
+    >>> classify(bmis)
+    ['Peso normal', 'Sobrepeso']
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+from .backends import BACKENDS, Backend
+from .classification import WHO_LABELS
+
+
+def get_backend(name: Optional[str] = None, sample=None) -> Backend:
+    """Backend pelo nome, ou inferido pelo tipo de ``sample`` quando ``name`` é None."""
+    if name is None:
+        module = type(sample).__module__.split(".")[0]
+        name = {"pandas": "pandas", "numpy": "numpy"}.get(module, "python")
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"backend desconhecido: {name!r} (disponíveis: {sorted(BACKENDS)})") from None
+
+
+def compute_bmi(
+    weights,
+    heights,
+    decimals: Optional[int] = None,
+    convert_cm: bool = False,
+    backend: Optional[str] = None,
+):
+    """IMC de cada par (peso em kg, altura em m); inválidos viram NaN.
+
+    ``decimals`` arredonda como o round() do Python; ``convert_cm`` trata alturas acima de 3
+    como centímetros. Devolve lista, array ou Series, conforme o backend.
+    """
+    return get_backend(backend, weights).compute_bmi(weights, heights, decimals, convert_cm)
+
+
+def classify(
+    bmis,
+    upper_inclusive: bool = False,
+    labels: Sequence[str] = WHO_LABELS,
+    undefined: str = "",
+    backend: Optional[str] = None,
+):
+    """Faixa da OMS de cada IMC (``undefined`` para None/NaN).
+
+    ``upper_inclusive=True`` usa os limites inclusivos de calculadora_imc.py (25,0 ainda é
+    "Peso normal"); o padrão segue imc_csv.py (25,0 já é "Sobrepeso").
+    """
+    return get_backend(backend, bmis).classify(bmis, upper_inclusive, labels, undefined)
@@ -0,0 +1,43 @@
+"""
+Faixas de IMC da OMS, definidas uma única vez, e a busca da faixa de um valor.
+
+A faixa é o índice em WHO_LABELS obtido por busca binária na tabela ordenada de limites
+(bisect / numpy.searchsorted), em vez de uma cadeia de comparações por valor. Os dois
+scripts diferem só no tratamento do limite exato:
+
+- imc_csv.py: intervalos fechados à esquerda (25,0 já é "Sobrepeso") -> ``upper_inclusive=False``
+- calculadora_imc.py: limites inclusivos da user story (25,0 ainda é "Peso normal") -> ``upper_inclusive=True``
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+
+# Limites entre as faixas, em ordem crescente
+WHO_THRESHOLDS = (18.5, 25, 30, 35, 40)
+
+# Rótulos das faixas, na ordem dos limites (len(WHO_THRESHOLDS) + 1 faixas)
+WHO_LABELS = (
+    "Abaixo do peso",
+    "Peso normal",
+    "Sobrepeso",
+    "Obesidade grau I",
+    "Obesidade grau II",
+    "Obesidade grau III",
+)
+# Mesmos rótulos com "Grau" maiúsculo, como na saída de calculadora_imc.py
+WHO_LABELS_CAPITALIZED = tuple(label.replace(" grau ", " Grau ") for label in WHO_LABELS)
+
+
+def category_index(bmi: float, upper_inclusive: bool = False) -> int:
+    """Índice da faixa de ``bmi`` em WHO_LABELS. ``bmi`` deve ser finito (NaN não tem faixa)."""
+    if upper_inclusive:
+        return bisect_left(WHO_THRESHOLDS, bmi)
+    return bisect_right(WHO_THRESHOLDS, bmi)
+
+
+def category_indices(np, values, upper_inclusive: bool = False):
+    """Versão vetorizada de category_index para um array numpy (``np`` é o módulo numpy).
+
+    NaN cai no índice da última faixa; quem chama deve tratá-lo antes ou depois.
+    """
+    return np.searchsorted(WHO_THRESHOLDS, values, side="left" if upper_inclusive else "right")
@@ -0,0 +1,218 @@
+"""
+Entrada e saída comprimidas (gzip, bz2, zstd) em fluxo, sem descomprimir para o disco.
+
+A compressão da entrada é detectada pelos bytes mágicos do início do arquivo (e, se ele
+estiver vazio, pela extensão); a da saída, pela extensão (.gz, .bz2, .zst). gzip e bz2 usam
+a biblioteca padrão; zstd requer o pacote ``zstandard`` (pip install zstandard), importado
+só quando necessário.
+
+Com ``threaded=True`` a (des)compressão roda em outra thread e conversa com o leitor/escritor
+por uma fila limitada: zlib, bz2 e zstandard liberam o GIL enquanto trabalham, então o codec
+roda em paralelo ao parse e ao cálculo do IMC.
+"""
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import queue
+import threading
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+# Bytes mágicos de cada formato
+MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+
+SUFFIXES = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+
+# Extensão usada ao gravar cada formato
+EXTENSIONS = {"gzip": ".gz", "bz2": ".bz2", "zstd": ".zst"}
+
+# Nível de compressão da saída: o padrão do módulo gzip (9) é bem mais lento que o do zlib (6)
+# com ganho pequeno de tamanho; bz2 não tem meio-termo útil; 3 é o padrão do zstd.
+LEVELS = {"gzip": 6, "bz2": 9, "zstd": 3}
+
+# Tamanho dos blocos trocados com a thread do codec e quantos ficam na fila
+BLOCK_BYTES = 1024 * 1024
+QUEUE_BLOCKS = 8
+
+
+class CodecUnavailableError(RuntimeError):
+    """O formato de compressão requer um pacote que não está instalado."""
+
+
+def compression_from_suffix(path: Path) -> Optional[str]:
+    """Formato indicado pela extensão (``dados.csv.gz`` -> "gzip"), ou None."""
+    return SUFFIXES.get(Path(path).suffix.lower())
+
+
+def detect_compression(path: Path) -> Optional[str]:
+    """Formato de compressão da entrada pelos bytes mágicos; None se não comprimida."""
+    with open(path, "rb") as f:
+        head = f.read(4)
+    for name, magic in MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None if head else compression_from_suffix(path)
+
+
+def strip_compression_suffix(path: Path) -> Path:
+    """``dados.csv.gz`` -> ``dados.csv``; caminhos sem extensão de compressão voltam iguais."""
+    path = Path(path)
+    return path.with_suffix("") if compression_from_suffix(path) else path
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise CodecUnavailableError("Arquivos .zst requerem o pacote zstandard (pip install zstandard).") from None
+    return zstandard
+
+
+def require_codec(codec: Optional[str]) -> None:
+    """Levanta CodecUnavailableError se o formato precisar de um pacote ausente."""
+    if codec == "zstd":
+        _zstandard()
+
+
+def _open_codec(path: Path, codec: str, mode: str) -> BinaryIO:
+    writing = "w" in mode or "a" in mode
+    if codec == "gzip":
+        return gzip.open(path, mode, compresslevel=LEVELS["gzip"]) if writing else gzip.open(path, mode)
+    if codec == "bz2":
+        return bz2.open(path, mode, compresslevel=LEVELS["bz2"]) if writing else bz2.open(path, mode)
+    if codec == "zstd":
+        zstandard = _zstandard()
+        if writing:
+            return zstandard.open(path, mode, cctx=zstandard.ZstdCompressor(level=LEVELS["zstd"]))
+        # O leitor do zstandard não implementa readline; o buffer permite iterar por linhas
+        return io.BufferedReader(zstandard.open(path, mode), BLOCK_BYTES)
+    raise ValueError(f"compressão desconhecida: {codec!r} (disponíveis: {sorted(MAGIC)})")
+
+
+class ThreadedReader(io.RawIOBase):
+    """Lê ``raw`` em blocos de BLOCK_BYTES em uma thread própria, à frente do consumidor."""
+
+    def __init__(self, raw: BinaryIO) -> None:
+        super().__init__()
+        self._raw = raw
+        self._queue: queue.Queue = queue.Queue(QUEUE_BLOCKS)
+        self._block = memoryview(b"")
+        self._eof = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._pump, name="codec-reader", daemon=True)
+        self._thread.start()
+
+    def _pump(self) -> None:
+        try:
+            while not self._stop.is_set():
+                block = self._raw.read(BLOCK_BYTES)
+                self._queue.put(block)
+                if not block:
+                    return
+        except BaseException as exc:  # repassada ao consumidor na próxima leitura
+            self._queue.put(exc)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._block and not self._eof:
+            item = self._queue.get()
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            self._eof = not item
+            self._block = memoryview(item)
+        n = min(len(buffer), len(self._block))
+        buffer[:n] = self._block[:n]
+        self._block = self._block[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            # Esvazia a fila para a thread não ficar presa em put() e poder terminar
+            while self._thread.is_alive():
+                try:
+                    self._queue.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+            self._raw.close()
+        super().close()
+
+
+class ThreadedWriter(io.RawIOBase):
+    """Repassa os blocos escritos a ``raw`` em uma thread própria; ``close`` espera a fila esvaziar."""
+
+    def __init__(self, raw: BinaryIO) -> None:
+        super().__init__()
+        self._raw = raw
+        self._queue: queue.Queue = queue.Queue(QUEUE_BLOCKS)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._pump, name="codec-writer", daemon=True)
+        self._thread.start()
+
+    def _pump(self) -> None:
+        while True:
+            block = self._queue.get()
+            if block is None:
+                return
+            if self._error is None:
+                try:
+                    self._raw.write(block)
+                except BaseException as exc:  # levantada no próximo write/close
+                    self._error = exc
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._check()
+        self._queue.put(bytes(data))
+        return len(data)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            self._raw.close()
+        finally:
+            super().close()
+        self._check()
+
+
+def open_input(path: Path, threaded: bool = False) -> BinaryIO:
+    """Abre a entrada para leitura binária, descomprimindo em fluxo se necessário."""
+    codec = detect_compression(path)
+    if codec is None:
+        return open(path, "rb")
+    stream = _open_codec(path, codec, "rb")
+    return io.BufferedReader(ThreadedReader(stream), BLOCK_BYTES) if threaded else stream
+
+
+def open_output(path: Path, threaded: bool = False) -> BinaryIO:
+    """Abre a saída para escrita binária, comprimindo conforme a extensão de ``path``."""
+    codec = compression_from_suffix(path)
+    if codec is None:
+        return open(path, "wb")
+    stream = _open_codec(path, codec, "wb")
+    # O buffer junta as escritas pequenas (uma por linha) em blocos antes do codec
+    return io.BufferedWriter(ThreadedWriter(stream) if threaded else stream, BLOCK_BYTES)
@@ -0,0 +1,208 @@
+"""
+Detecção do formato de um CSV de pacientes, compartilhada por imc_csv.py e pelo serviço
+(imc_core.server): delimitador, separador decimal, unidade da altura e colunas de peso/altura
+(pelo nome, com variações comuns como "Peso (kg)").
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import re
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .compression import open_input
+from .rows import make_number_parser
+
+
+# Tamanho (em bytes) da amostra do início do arquivo usada para detectar o delimitador.
+SAMPLE_BYTES = 5000
+
+
+# Quantidade de linhas usadas na detecção do decimal e da unidade da altura. Sem amostragem
+# estratificada (entrada comprimida ou encoding multibyte), são as primeiras linhas do arquivo,
+# que ficam em um buffer e são reinjetadas no fluxo antes das demais.
+HEAD_ROWS = 200
+
+
+def normalize_name(s: str) -> str:
+    """Normaliza nomes de colunas: minúsculas, sem acentos e apenas letras/números/_.
+    Ex.: "Peso (kg)" -> "peso_kg"
+    """
+    s = s.strip().lower()
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    s = re.sub(r"[^a-z0-9]+", "_", s)
+    s = re.sub(r"_+", "_", s).strip("_")
+    return s
+
+
+def read_sample(path: Path, encoding: str, max_bytes: int = SAMPLE_BYTES) -> str:
+    """Lê no máximo ``max_bytes`` do início do arquivo e devolve o texto decodificado.
+
+    A decodificação é incremental (caracteres multibyte cortados no limite são descartados) e,
+    se o arquivo for maior que a amostra, o texto é cortado na última quebra de linha completa
+    para que o detector não veja um registro pela metade. O custo é O(amostra), não O(arquivo).
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="ignore")
+    with open_input(path) as f:
+        raw = f.read(max_bytes)
+        at_eof = len(raw) < max_bytes or not f.read(1)
+    text = decoder.decode(raw, final=at_eof)
+    if not at_eof:
+        cut = max(text.rfind("\n"), text.rfind("\r"))
+        if cut > 0:
+            text = text[: cut + 1]
+    return text
+
+
+def detect_delimiter(sample: str) -> str:
+    """Tenta detectar delimitador com csv.Sniffer; fallback para ";" se muitas ocorrências."""
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t"])  # pragma: no cover
+        return dialect.delimiter
+    except Exception:
+        # Heurística simples
+        commas = sample.count(",")
+        semis = sample.count(";")
+        if semis > commas:
+            return ";"
+        return ","
+
+
+def detect_decimal_from_values(values: Iterable[str]) -> str:
+    """Detecta separador decimal observando padrões 123,45 vs 123.45 nos valores."""
+    comma_hits = 0
+    dot_hits = 0
+    pattern_comma = re.compile(r"\d+,\d+")
+    pattern_dot = re.compile(r"\d+\.\d+")
+    for v in values:
+        if not isinstance(v, str):
+            continue
+        if pattern_comma.search(v):
+            comma_hits += 1
+        if pattern_dot.search(v):
+            dot_hits += 1
+    return "," if comma_hits > dot_hits else "."
+
+
+def find_weight_height_columns(fieldnames: List[str]) -> Tuple[Optional[str], Optional[str]]:
+    weight_keys = {
+        "peso",
+        "peso_kg",
+        "massa",
+        "massa_kg",
+        "weight",
+        "weight_kg",
+        "mass",
+        "mass_kg",
+    }
+    height_keys = {
+        "altura",
+        "altura_m",
+        "estatura",
+        "height",
+        "height_m",
+        "tamanho",
+    }
+    norm_to_orig: Dict[str, str] = {normalize_name(h): h for h in fieldnames}
+    weight_col = next((norm_to_orig[n] for n in norm_to_orig if n in weight_keys), None)
+    height_col = next((norm_to_orig[n] for n in norm_to_orig if n in height_keys), None)
+    return weight_col, height_col
+
+
+def find_patient_columns(fieldnames: List[str]) -> List[str]:
+    """Colunas que identificam o paciente (ex.: "Paciente", "ID", "Nome"), na ordem original."""
+    patient_keys = {
+        "paciente",
+        "nome",
+        "nome_paciente",
+        "id",
+        "id_paciente",
+        "codigo",
+        "prontuario",
+        "patient",
+        "patient_id",
+        "name",
+    }
+    return [h for h in fieldnames if normalize_name(h) in patient_keys]
+
+
+def decide_decimal(rows: List[Dict[str, str]], candidates: List[str]) -> str:
+    # Coleta uma amostra de valores das colunas relevantes para detecção
+    values: List[str] = []
+    for row in rows[:HEAD_ROWS]:
+        for c in candidates:
+            v = row.get(c)
+            if v:
+                values.append(str(v))
+    if not values:
+        return "."
+    return detect_decimal_from_values(values)
+
+
+def has_decimal_evidence(rows: List[Dict[str, str]], candidates: List[str]) -> bool:
+    """Indica se algum valor das colunas ``candidates`` tem parte decimal ("70,5", "1.75").
+
+    Sem isso (amostra vazia ou só inteiros), decide_decimal devolve "." por padrão, não por detecção.
+    """
+    pattern = re.compile(r"\d[.,]\d")
+    return any(pattern.search(str(row.get(c) or "")) for row in rows[:HEAD_ROWS] for c in candidates)
+
+
+def detect_height_unit(values: Iterable[Optional[str]], decimal: str) -> str:
+    """Unidade das alturas da amostra: "m", "cm", "misto" ou "" (sem alturas válidas).
+
+    Usa a mesma regra de bmi_cells (acima de 3 é cm). É informativa: a conversão continua
+    valor a valor, o que já trata arquivos que misturam as duas unidades.
+    """
+    parse = make_number_parser(decimal)
+    heights = [h for h in map(parse, values) if h]
+    if not heights:
+        return ""
+    in_cm = sum(1 for h in heights if h > 3)
+    return "cm" if in_cm == len(heights) else "m" if in_cm == 0 else "misto"
+
+
+class CsvInputError(Exception):
+    """Problema no arquivo de entrada (inexistente, sem cabeçalho, sem colunas de peso/altura)."""
+
+
+@dataclass(frozen=True)
+class DetectedLayout:
+    """Resultado da detecção para um layout de cabeçalho (o que o registro de layouts do imc_csv.py guarda)."""
+
+    delimiter: str
+    decimal_in: str
+    weight_col: str
+    height_col: str
+    height_unit: str = ""
+
+
+def resolve_weight_height(
+    fieldnames: List[str],
+    weight_col: Optional[str] = None,
+    height_col: Optional[str] = None,
+    layout: Optional[DetectedLayout] = None,
+) -> Tuple[str, str]:
+    """Colunas de peso/altura: as informadas, as registradas em ``layout`` ou as detectadas pelo nome.
+
+    Levanta CsvInputError se alguma não puder ser identificada.
+    """
+    if layout is not None and layout.weight_col in fieldnames and layout.height_col in fieldnames:
+        weight_col = weight_col or layout.weight_col
+        height_col = height_col or layout.height_col
+    if not weight_col or not height_col:
+        auto_w, auto_h = find_weight_height_columns(fieldnames)
+        weight_col = weight_col or auto_w
+        height_col = height_col or auto_h
+
+    if not weight_col or not height_col:
+        raise CsvInputError(
+            "Não foi possível identificar as colunas de peso e altura. "
+            "Informe-as com --peso-col e --altura-col.\n"
+            f"Colunas disponíveis: {fieldnames}"
+        )
+    return weight_col, height_col
@@ -0,0 +1,283 @@
+"""
+Cálculo do IMC linha a linha de um CSV, compartilhado por imc_csv.py e pelo serviço (imc_core.server).
+
+Conversão dos números (separador decimal e de milhar), células de saída "imc" e "categoria_imc"
+de uma linha e o engine posicional (linhas como listas), com os parâmetros já resolvidos em
+PipelineConfig; e a regra de aspas do módulo csv usada para agrupar linhas físicas em registros
+(linha a linha ou, em blocos inteiros, por expressão regular).
+"""
+from __future__ import annotations
+
+import codecs
+import math
+import re
+from dataclasses import dataclass
+from typing import AnyStr, Callable, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple
+
+from .classification import WHO_LABELS, category_index
+
+
+def parse_number(text: str, decimal: str) -> Optional[float]:
+    """Converte string numérica para float respeitando separador decimal.
+    Trata separadores de milhar ("." ou ","). Retorna None se vazio/ inválido.
+    """
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    s = str(text).strip()
+    if s == "":
+        return None
+    # Remove espaços e símbolos não numéricos exceto dígitos, separador decimal e sinal
+    s = s.replace("\u00A0", " ").strip()
+
+    # Normaliza separadores: remove milhares e converte decimal para ponto
+    if decimal == ",":
+        # Formatos possíveis: 1.234,56 (pt-BR) ou 1234,56
+        s = s.replace(".", "")
+        s = s.replace(",", ".")
+    else:
+        # decimal == ".": formatos 1,234.56 (en) ou 1234.56
+        s = s.replace(",", "")
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+# Rótulos das faixas, definidos (com os limites) em imc_core.classification.
+BMI_CATEGORIES = WHO_LABELS
+
+
+NumberParser = Callable[[Optional[str]], Optional[float]]
+
+
+def make_number_parser(decimal: str) -> NumberParser:
+    """Cria um parse_number especializado para o separador decimal informado.
+
+    Mesmo resultado de ``parse_number(text, decimal)``, mas sem decidir o separador a cada
+    célula: células sem separador (ex.: "70") vão direto para float(), que já ignora espaços
+    nas pontas, e as demais só fazem os replace necessários.
+    """
+    if decimal == ",":
+
+        def parse(text: Optional[str]) -> Optional[float]:
+            if text.__class__ is not str:
+                return parse_number(text, decimal)  # None, int, float
+            if "," in text:
+                text = text.replace(".", "").replace(",", ".")
+            elif "." in text:
+                text = text.replace(".", "")
+            try:
+                return float(text)
+            except ValueError:
+                return None
+
+    else:
+
+        def parse(text: Optional[str]) -> Optional[float]:
+            if text.__class__ is not str:
+                return parse_number(text, decimal)  # None, int, float
+            if "," in text:
+                text = text.replace(",", "")
+            try:
+                return float(text)
+            except ValueError:
+                return None
+
+    return parse
+
+
+def categorize_bmi(bmi: float) -> str:
+    if math.isnan(bmi) or math.isinf(bmi):
+        return ""
+    return BMI_CATEGORIES[category_index(bmi)]
+
+
+@dataclass
+class RunStats:
+    """Contadores acumulados durante o processamento em streaming."""
+
+    total: int = 0
+    errors: int = 0
+
+    @property
+    def ok(self) -> int:
+        return self.total - self.errors
+
+
+def bmi_cells(weight_raw: Optional[str], height_raw: Optional[str], parse: NumberParser) -> Tuple[str, str, bool]:
+    """Calcula as células de saída de uma linha: (imc formatado, categoria, dados válidos)."""
+    w = parse(weight_raw)
+    h = parse(height_raw)
+    valid = True
+    bmi_value: Optional[float] = None
+    if w is None or h is None or h == 0:
+        valid = False
+    else:
+        # Se altura parecer estar em cm, converte para m
+        if h > 3:  # heurística simples
+            h = h / 100.0
+        try:
+            bmi_value = w / (h * h)
+        except Exception:
+            valid = False
+    if bmi_value is not None and bmi_value > 0 and math.isfinite(bmi_value):
+        # Já é finito: consulta a tabela direto, sem repetir as checagens de categorize_bmi
+        return f"{bmi_value:.2f}", BMI_CATEGORIES[category_index(bmi_value)], valid
+    return "", "", valid
+
+
+@dataclass(frozen=True)
+class PipelineConfig:
+    """Parâmetros já resolvidos (detectados ou informados) de uma execução."""
+
+    encoding: str
+    delimiter: str
+    fieldnames: Tuple[str, ...]
+    out_fields: Tuple[str, ...]
+    weight_col: str
+    height_col: str
+    decimal_in: str
+    decimal_out: str = "."
+    engine: str = "python"
+    line_terminator: str = "\r\n"  # usado pelo engine "passthrough" em registros sem terminador
+    use_mmap: bool = False
+    height_unit: str = ""  # informativa (ver detect_height_unit)
+
+
+def last_index(names: Sequence[str], name: Optional[str]) -> Optional[int]:
+    """Índice da última ocorrência (é a que vale em um dict criado a partir do cabeçalho)."""
+    for i in range(len(names) - 1, -1, -1):
+        if names[i] == name:
+            return i
+    return None
+
+
+@dataclass(frozen=True)
+class ListColumns:
+    """Índices resolvidos uma vez para os engines que trabalham com linhas em lista."""
+
+    width: int
+    tail: Tuple[str, ...]  # células das colunas novas, acrescentadas a cada linha
+    weight_idx: Optional[int]
+    height_idx: Optional[int]
+    imc_idx: int
+    category_idx: int
+    duplicates: Tuple[Tuple[int, int], ...]  # (destino, origem) de nomes de coluna repetidos
+
+
+def list_columns(config: PipelineConfig) -> ListColumns:
+    out_fields = config.out_fields
+    return ListColumns(
+        width=len(config.fieldnames),
+        tail=("",) * (len(out_fields) - len(config.fieldnames)),
+        weight_idx=last_index(config.fieldnames, config.weight_col),
+        height_idx=last_index(config.fieldnames, config.height_col),
+        imc_idx=last_index(out_fields, "imc"),
+        category_idx=last_index(out_fields, "categoria_imc"),
+        duplicates=tuple(
+            (i, last_index(out_fields, name)) for i, name in enumerate(out_fields) if last_index(out_fields, name) != i
+        ),
+    )
+
+
+def iter_bmi_lists(
+    rows: Iterable[List[str]],
+    config: PipelineConfig,
+    stats: Optional[RunStats] = None,
+) -> Iterator[List[str]]:
+    """Engine posicional: linhas como listas (csv.reader), colunas resolvidas por índice uma vez.
+
+    Reproduz exatamente a saída do caminho com DictReader/DictWriter: linhas curtas são
+    completadas com "", colunas extras descartadas, nomes de coluna repetidos recebem o valor
+    da última ocorrência e o decimal de saída já é aplicado aqui.
+    """
+    stats = stats if stats is not None else RunStats()
+    parse = make_number_parser(config.decimal_in)
+    columns = list_columns(config)
+    width, tail = columns.width, columns.tail
+    weight_idx, height_idx = columns.weight_idx, columns.height_idx
+    imc_idx, category_idx, duplicates = columns.imc_idx, columns.category_idx, columns.duplicates
+    comma_out = config.decimal_out == ","
+    for row in rows:
+        n = len(row)
+        if n != width:
+            row = row[:width] if n > width else row + [""] * (width - n)
+        if tail:
+            row.extend(tail)
+        imc, category, valid = bmi_cells(
+            row[weight_idx] if weight_idx is not None else None,
+            row[height_idx] if height_idx is not None else None,
+            parse,
+        )
+        stats.total += 1
+        if not valid:
+            stats.errors += 1
+        row[imc_idx] = imc.replace(".", ",") if comma_out else imc
+        row[category_idx] = category
+        for dst, src in duplicates:
+            row[dst] = row[src]
+        yield row
+
+
+def bom_free_encoding(encoding: str) -> str:
+    """Codec para codificar trechos do meio do arquivo (utf-8-sig colocaria um BOM em cada um)."""
+    return "utf-8" if codecs.lookup(encoding).name == "utf-8-sig" else encoding
+
+
+def ends_in_quoted_field(
+    line: AnyStr, in_quotes: bool, delimiter: AnyStr, quotechar: AnyStr, start: int = 0, end: Optional[int] = None
+) -> bool:
+    """Diz se ``line[start:end]`` (uma linha física) termina dentro de um campo entre aspas.
+
+    ``in_quotes`` é o estado no início da linha (a anterior terminou dentro de aspas). Segue o
+    dialeto padrão do módulo csv: aspas só abrem um campo no início dele (início da linha ou logo
+    após o delimitador); dentro do campo, aspas duplicadas são literais e aspas simples o fecham;
+    no meio de um campo sem aspas (ex.: ``tela 12" ok``) são um caractere comum. Funciona com
+    ``str`` e com ``bytes``.
+    """
+    end = len(line) if end is None else end
+    i = start
+    if not in_quotes and line.find(quotechar, i, end) == -1:
+        return False
+    while True:
+        if in_quotes:
+            q = line.find(quotechar, i, end)
+            if q == -1:
+                return True
+            if q + 1 < end and line.startswith(quotechar, q + 1):
+                i = q + 2  # aspas duplicadas dentro do campo
+                continue
+            in_quotes = False
+            i = q + 1  # o que vier até o delimitador é texto comum do mesmo campo
+        elif i < end and line.startswith(quotechar, i):
+            in_quotes = True
+            i += 1
+            continue
+        d = line.find(delimiter, i, end)
+        if d == -1:
+            return False
+        i = d + 1
+
+
+def quote_patterns(delimiter: AnyStr) -> Tuple[Pattern[AnyStr], Pattern[AnyStr]]:
+    """Expressões que aplicam a regra de ends_in_quoted_field a um bloco inteiro de linhas.
+
+    A primeira acha um campo entre aspas que chega a uma quebra de linha sem fechar (pode dar
+    falso positivo, nunca falso negativo): blocos sem ela não têm quebra de linha dentro de aspas.
+    A segunda casa cada campo entre aspas inteiro (aspas duplicadas são literais; a aspa que
+    fecha não é seguida de outra) ou, se ele não fecha, até o fim do trecho. São ``bytes`` ou
+    ``str``, como ``delimiter``.
+    """
+    # A aspa vem primeiro (o re a procura como literal) e o lookbehind confere se ela abre o
+    # campo: antes dela só o início do trecho, uma quebra de linha ou o delimitador
+    as_bytes = isinstance(delimiter, bytes)
+    field_quote = r'"(?<![^' + re.escape(delimiter.decode("ascii") if as_bytes else delimiter) + r'\n]")'
+    # (?=(...))\1 é um grupo atômico (sem retrocesso), que o re só tem a partir do Python 3.11
+    sources = (
+        field_quote + r'(?=([^"\n]*(?:""[^"\n]*)*))\1\n',
+        field_quote + r'[^"]*(?:""[^"]*)*(?:"(?!")|\Z)',
+    )
+    open_at_newline, quoted_field = (re.compile(src.encode("ascii") if as_bytes else src) for src in sources)
+    return open_at_newline, quoted_field
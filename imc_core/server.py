@@ -0,0 +1,563 @@
+"""
+Serviço residente de IMC (asyncio), via HTTP em TCP ou em socket Unix.
+
+Evita pagar a cada cálculo a partida do interpretador, os imports e o argparse dos scripts:
+o processo fica no ar com tudo já importado e atende:
+
+- ``POST /imc``   JSON ``{"weights": [...], "heights": [...]}`` (opcionais: ``decimals``,
+  ``convert_cm``, ``upper_inclusive``) -> ``{"count": n, "bmi": [...], "category": [...]}``,
+  calculado por imc_core.compute_bmi/classify (inválidos -> ``null``/``""``).
+- ``POST /csv``   corpo CSV -> CSV com "imc" e "categoria_imc", com as mesmas regras e a mesma
+  saída de ``imc_csv.py --engine positional`` (inclusive o BOM de utf-8-sig). O corpo é processado
+  em blocos à medida que chega e a resposta volta em streaming (Transfer-Encoding: chunked).
+  Parâmetros opcionais na query: ``delimiter``, ``decimal``, ``saida_decimal``, ``peso_col``,
+  ``altura_col``, ``encoding``. Sem ``decimal``, os registros ficam retidos (em memória e, acima
+  de ``MAX_PENDING_OUTPUT``, em arquivo temporário) até algum peso/altura ter casas decimais; o
+  corpo que termina sem nenhum usa ".", como o imc_csv, e o que passa de ``MAX_UNDECIDED_BYTES``
+  sem nenhum recebe 400 (informe ``decimal``). Um registro com mais de ``MAX_PENDING_RECORD``
+  bytes (aspas que nunca fecham) também recebe 400.
+  Enquanto o corpo chega, no máximo ``MAX_PENDING_OUTPUT`` bytes da resposta ficam em memória à
+  espera do cliente; o excedente vai para um arquivo temporário e é enviado depois do corpo.
+- ``GET /metrics`` contadores, latência (média, p50, p95, p99) e vazão desde a partida.
+
+A decodificação do JSON, o cálculo e o processamento de cada bloco CSV rodam no executor padrão
+do loop (``loop.run_in_executor``), então uma requisição grande não trava as demais conexões.
+
+Uso (da raiz do repositório):
+    python -m imc_core.server --port 8080
+    python -m imc_core.server --unix /tmp/imc.sock
+
+    curl -s localhost:8080/imc -d '{"weights": [70, 95], "heights": [1.75, 1.80]}'
+    curl -s --data-binary @pacientes.csv 'localhost:8080/csv?delimiter=;' -o pacientes_com_imc.csv
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import codecs
+import csv
+import io
+import json
+import math
+import sys
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import IO, Deque, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .batch import classify, compute_bmi
+from .detection import (
+    HEAD_ROWS,
+    SAMPLE_BYTES,
+    CsvInputError,
+    decide_decimal,
+    detect_delimiter,
+    has_decimal_evidence,
+    resolve_weight_height,
+)
+from .rows import PipelineConfig, RunStats, bom_free_encoding, ends_in_quoted_field, iter_bmi_lists, quote_patterns
+
+try:
+    import numpy  # noqa: F401  (importado na partida: as requisições já o encontram carregado)
+
+    _HAS_NUMPY = True
+except ImportError:
+    _HAS_NUMPY = False
+
+# Bytes lidos do corpo por vez (também o tamanho aproximado de cada bloco da resposta CSV)
+READ_BYTES = 256 * 1024
+# Limite de tamanho do cabeçalho HTTP e do corpo JSON
+MAX_HEADER_BYTES = 64 * 1024
+MAX_JSON_BYTES = 64 * 1024 * 1024
+# Resposta CSV não lida pelo cliente mantida em memória; acima disso vai para um arquivo temporário
+MAX_PENDING_OUTPUT = 8 * 1024 * 1024
+# Corpo CSV retido (sem parâmetro decimal) à espera de um peso/altura com casas decimais; a saída
+# dele sai de uma vez quando o decimal é decidido
+MAX_UNDECIDED_BYTES = 64 * 1024 * 1024
+# Registro CSV incompleto (campo entre aspas ainda aberto) acumulado entre blocos
+MAX_PENDING_RECORD = 16 * 1024 * 1024
+# Latências guardadas para os percentis de /metrics
+LATENCY_WINDOW = 10_000
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+}
+
+
+class HttpError(Exception):
+    """Erro a ser devolvido ao cliente com o status HTTP informado."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class StreamAborted(Exception):
+    """Erro depois de a resposta em streaming ter começado: só resta encerrar a conexão."""
+
+    def __init__(self, status: int) -> None:
+        super().__init__(status)
+        self.status = status
+
+
+@dataclass
+class EndpointMetrics:
+    requests: int = 0
+    errors: int = 0
+    rows: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    busy_s: float = 0.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+
+class ServiceMetrics:
+    """Métricas por endpoint: requisições, erros, linhas, bytes, latência e vazão."""
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+
+    def record(self, endpoint: str, status: int, rows: int, bytes_in: int, bytes_out: int, elapsed: float) -> None:
+        m = self.endpoints.setdefault(endpoint, EndpointMetrics())
+        m.requests += 1
+        m.errors += status >= 400
+        m.rows += rows
+        m.bytes_in += bytes_in
+        m.bytes_out += bytes_out
+        m.busy_s += elapsed
+        m.latencies.append(elapsed)
+
+    def snapshot(self) -> Dict[str, object]:
+        endpoints = {}
+        for name, m in sorted(self.endpoints.items()):
+            ordered = sorted(m.latencies)
+
+            def pct(p: float) -> float:
+                return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3) if ordered else 0.0
+
+            endpoints[name] = {
+                "requests": m.requests,
+                "errors": m.errors,
+                "rows": m.rows,
+                "bytes_in": m.bytes_in,
+                "bytes_out": m.bytes_out,
+                "latency_ms": {
+                    "mean": round(m.busy_s / m.requests * 1000, 3) if m.requests else 0.0,
+                    "p50": pct(0.50),
+                    "p95": pct(0.95),
+                    "p99": pct(0.99),
+                },
+                # Linhas por segundo de atendimento (tempo somado das requisições do endpoint)
+                "rows_per_s": round(m.rows / m.busy_s, 1) if m.busy_s > 0 else 0.0,
+            }
+        return {"uptime_s": round(time.time() - self.started, 3), "endpoints": endpoints}
+
+
+def split_complete_records(text: str, delimiter: str = ",") -> Tuple[str, str]:
+    """Separa ``text`` em (registros completos, resto), sem cortar campos entre aspas com quebra de linha.
+
+    As aspas seguem as regras do csv (ends_in_quoted_field): uma aspa no meio de um campo sem aspas
+    não abre um campo. Só um texto com algum campo entre aspas aberto em uma quebra de linha é
+    percorrido linha a linha.
+    """
+    last = text.rfind("\n") + 1
+    open_at_newline, _ = quote_patterns(delimiter)
+    if open_at_newline.search(text, 0, last) is None:
+        return text[:last], text[last:]
+    in_quotes = False
+    cut = 0
+    i = 0
+    while True:
+        nl = text.find("\n", i)
+        if nl == -1:
+            break
+        in_quotes = ends_in_quoted_field(text, in_quotes, delimiter, '"', i, nl)
+        i = nl + 1
+        if not in_quotes:
+            cut = i
+    return text[:cut], text[cut:]
+
+
+def _finite_or_none(values) -> List[Optional[float]]:
+    # NaN/inf não existem em JSON
+    return [float(v) if math.isfinite(v) else None for v in values]
+
+
+def handle_json(body: bytes) -> Tuple[Dict[str, object], int]:
+    """POST /imc: devolve (resposta, linhas calculadas)."""
+    try:
+        payload = json.loads(body)
+        weights = [math.nan if w is None else float(w) for w in payload["weights"]]
+        heights = [math.nan if h is None else float(h) for h in payload["heights"]]
+    except (ValueError, TypeError, KeyError) as exc:
+        raise HttpError(400, f"JSON inválido: esperado {{'weights': [...], 'heights': [...]}} ({exc})") from None
+    if len(weights) != len(heights):
+        raise HttpError(400, "'weights' e 'heights' devem ter o mesmo tamanho")
+    decimals = payload.get("decimals")
+    if decimals is not None and (not isinstance(decimals, int) or isinstance(decimals, bool)):
+        raise HttpError(400, "'decimals' deve ser um inteiro")
+    backend = "numpy" if _HAS_NUMPY and len(weights) >= 64 else "python"
+    bmis = compute_bmi(
+        weights, heights, decimals=decimals, convert_cm=bool(payload.get("convert_cm")), backend=backend
+    )
+    categories = classify(bmis, upper_inclusive=bool(payload.get("upper_inclusive")), backend=backend)
+    return {"count": len(weights), "bmi": _finite_or_none(bmis), "category": list(categories)}, len(weights)
+
+
+def _json_bytes(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _imc_response(body: bytes) -> Tuple[bytes, int]:
+    """POST /imc completo (decodificação, cálculo e serialização), para rodar fora do loop."""
+    result, rows = handle_json(body)
+    return _json_bytes(result), rows
+
+
+class CsvStream:
+    """Processa o corpo CSV de POST /csv em blocos, com as regras do engine posicional do imc_csv."""
+
+    def __init__(self, query: Dict[str, str]) -> None:
+        self.query = query
+        self.encoding = query.get("encoding", "utf-8-sig")
+        try:
+            self.decoder = codecs.getincrementaldecoder(self.encoding)()
+        except LookupError:
+            raise HttpError(400, f"encoding desconhecido: {self.encoding}") from None
+        if query.get("saida_decimal", ".") not in (",", "."):
+            raise HttpError(400, "saida_decimal deve ser ',' ou '.'")
+        self.pending = ""
+        self.delimiter = ""  # definido com a amostra do primeiro bloco
+        self.fieldnames: List[str] = []  # definido com o primeiro registro
+        self.columns: Tuple[str, str] = ("", "")
+        # Registros completos retidos até a decisão do decimal (só sem o parâmetro decimal)
+        self.undecided: Optional[IO[str]] = None
+        self.undecided_bytes = 0
+        self.config: Optional[PipelineConfig] = None
+        self.stats = RunStats()
+
+    def feed(self, data: bytes, final: bool = False) -> bytes:
+        """Recebe um pedaço do corpo; devolve a saída (bytes) dos registros já completos."""
+        try:
+            self.pending += self.decoder.decode(data, final=final)
+        except UnicodeDecodeError as exc:
+            raise HttpError(422, f"corpo não está em {self.encoding}: {exc}") from None
+        if not self.delimiter:
+            if not final and len(self.pending) < SAMPLE_BYTES:
+                return b""  # ainda sem amostra suficiente para a detecção
+            self.delimiter = self.query.get("delimiter") or detect_delimiter(self.pending)
+        if final:
+            complete, self.pending = self.pending, ""
+        else:
+            complete, self.pending = split_complete_records(self.pending, self.delimiter)
+            if len(self.pending) > MAX_PENDING_RECORD:
+                raise HttpError(
+                    400, f"registro CSV com mais de {MAX_PENDING_RECORD} bytes (campo entre aspas que não fecha?)"
+                )
+        rows: Iterator[List[str]] = (
+            row for row in csv.reader(io.StringIO(complete, newline=""), delimiter=self.delimiter) if row
+        )
+        if not self.fieldnames:
+            if not complete:
+                return b""
+            self._read_header(rows)
+        out = io.StringIO()
+        first = self.config is None
+        if first:
+            rows = self._decide_decimal(rows, len(complete), final)
+            if self.config is None:
+                return b""  # decimal ainda indefinido: o bloco ficou retido
+            csv.writer(out, delimiter=self.delimiter).writerow(self.config.out_fields)
+        writer = csv.writer(out, delimiter=self.delimiter)
+        writer.writerows(iter_bmi_lists(rows, self.config, self.stats))
+        # Como no arquivo do imc_csv, o BOM (utf-8-sig, utf-16) só vai no início da saída
+        return out.getvalue().encode(self.encoding if first else bom_free_encoding(self.encoding))
+
+    def _read_header(self, rows: Iterator[List[str]]) -> None:
+        """Primeiro registro: cabeçalho e colunas de peso/altura (como em imc_csv.process_file)."""
+        fieldnames = next(rows, None)
+        if not fieldnames:
+            raise HttpError(422, "Não foi possível ler o cabeçalho do CSV.")
+        try:
+            self.columns = resolve_weight_height(fieldnames, self.query.get("peso_col"), self.query.get("altura_col"))
+        except CsvInputError as exc:
+            raise HttpError(422, str(exc)) from None
+        self.fieldnames = fieldnames
+
+    def _decide_decimal(self, rows: Iterator[List[str]], size: int, final: bool) -> Iterator[List[str]]:
+        """Define o decimal e monta a configuração assim que possível; devolve as linhas a processar.
+
+        Com o parâmetro decimal, decide já. Senão, como imc_csv decide pela amostra do arquivo
+        inteiro, os blocos ficam retidos até aparecer um peso/altura com casas decimais; um corpo
+        sem nenhum usa "." (sem casas decimais, os dois separadores dão o mesmo resultado).
+        """
+        fieldnames = self.fieldnames
+        decimal_in = self.query.get("decimal")
+        if decimal_in is None:
+            block = list(rows)
+            rows = iter(block)
+            columns = list(self.columns)
+            evidence = [
+                sample
+                for sample in (dict(zip(fieldnames, row)) for row in block)
+                if has_decimal_evidence([sample], columns)
+            ]
+            if evidence:
+                decimal_in = decide_decimal(evidence[:HEAD_ROWS], columns)
+            elif final:
+                decimal_in = "."
+            else:
+                self._hold(block, size)
+                return iter(())
+        out_fields = list(fieldnames) + [c for c in ("imc", "categoria_imc") if c not in fieldnames]
+        weight_col, height_col = self.columns
+        self.config = PipelineConfig(
+            encoding=self.encoding,
+            delimiter=self.delimiter,
+            fieldnames=tuple(fieldnames),
+            out_fields=tuple(out_fields),
+            weight_col=weight_col,
+            height_col=height_col,
+            decimal_in=decimal_in,
+            decimal_out=self.query.get("saida_decimal", "."),
+            engine="positional",
+        )
+        if self.undecided is None:
+            return rows
+        held, self.undecided = self.undecided, None
+        held.seek(0)
+        return chain(_read_and_close(held, self.delimiter), rows)
+
+    def _hold(self, block: List[List[str]], size: int) -> None:
+        self.undecided_bytes += size
+        if self.undecided_bytes > MAX_UNDECIDED_BYTES:
+            raise HttpError(
+                400,
+                f"nenhum peso/altura com casas decimais nos primeiros {MAX_UNDECIDED_BYTES} bytes; "
+                "informe o separador decimal com o parâmetro decimal",
+            )
+        if self.undecided is None:
+            self.undecided = tempfile.SpooledTemporaryFile(
+                max_size=MAX_PENDING_OUTPUT, mode="w+", encoding="utf-8", newline="", prefix="imc_server_"
+            )
+        csv.writer(self.undecided, delimiter=self.delimiter).writerows(block)
+
+    def close(self) -> None:
+        if self.undecided is not None:
+            self.undecided.close()
+
+
+def _read_and_close(f: IO[str], delimiter: str) -> Iterator[List[str]]:
+    with f:
+        yield from csv.reader(f, delimiter=delimiter)
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    try:
+        raw = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None  # conexão encerrada entre requisições
+    except asyncio.LimitOverrunError:
+        raise HttpError(413, "cabeçalho HTTP grande demais") from None
+    lines = raw.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "linha de requisição inválida") from None
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return method, target, headers
+
+
+def _response_head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"] + [f"{k}: {v}" for k, v in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+class BmiService:
+    """Servidor HTTP/1.1 mínimo (keep-alive, corpo com Content-Length) sobre asyncio streams."""
+
+    def __init__(self) -> None:
+        self.metrics = ServiceMetrics()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while await self._handle_one(reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_one(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        started = time.perf_counter()
+        endpoint = "?"
+        counters = {"rows": 0, "in": 0, "out": 0}
+        keep_alive = True
+        try:
+            head = await _read_head(reader)
+            if head is None:
+                return False
+            method, target, headers = head
+            keep_alive = headers.get("connection", "").lower() != "close"
+            url = urlsplit(target)
+            endpoint = url.path
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            length = headers.get("content-length")
+            if method == "GET" and url.path == "/metrics":
+                status = await self._send_json(writer, 200, self.metrics.snapshot(), counters)
+            elif url.path not in ("/imc", "/csv"):
+                raise HttpError(404, f"caminho desconhecido: {url.path}")
+            elif method != "POST":
+                raise HttpError(405, "use POST")
+            elif length is None or not length.isdigit():
+                raise HttpError(411, "informe Content-Length")
+            elif url.path == "/imc":
+                if int(length) > MAX_JSON_BYTES:
+                    raise HttpError(413, "corpo JSON grande demais")
+                body = await reader.readexactly(int(length))
+                counters["in"] = len(body)
+                loop = asyncio.get_running_loop()
+                encoded, counters["rows"] = await loop.run_in_executor(None, _imc_response, body)
+                status = await self._send_body(writer, 200, encoded, counters)
+            else:
+                status = await self._stream_csv(reader, writer, int(length), query, counters)
+        except HttpError as exc:
+            status = exc.status
+            keep_alive = False  # o corpo pode não ter sido lido por inteiro
+            await self._send_json(writer, exc.status, {"error": str(exc)}, counters)
+        except StreamAborted as exc:
+            status = exc.status
+            keep_alive = False
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise
+        except Exception as exc:  # erro inesperado: responde 500 e mantém o serviço no ar
+            status = 500
+            keep_alive = False
+            print(f"Erro ao atender {endpoint}: {exc!r}", file=sys.stderr)
+            await self._send_json(writer, 500, {"error": "erro interno"}, counters)
+        self.metrics.record(endpoint, status, counters["rows"], counters["in"], counters["out"], time.perf_counter() - started)
+        return keep_alive
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload, counters: Dict[str, int]) -> int:
+        return await self._send_body(writer, status, _json_bytes(payload), counters)
+
+    async def _send_body(self, writer: asyncio.StreamWriter, status: int, body: bytes, counters: Dict[str, int]) -> int:
+        writer.write(
+            _response_head(status, {"Content-Type": "application/json; charset=utf-8", "Content-Length": str(len(body))})
+        )
+        writer.write(body)
+        await writer.drain()
+        counters["out"] += len(body)
+        return status
+
+    async def _stream_csv(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        length: int,
+        query: Dict[str, str],
+        counters: Dict[str, int],
+    ) -> int:
+        stream = CsvStream(query)
+        loop = asyncio.get_running_loop()
+        remaining = length
+        started = False
+        spill: Optional[IO[bytes]] = None
+        try:
+            while True:
+                data = await reader.read(min(READ_BYTES, remaining)) if remaining else b""
+                if remaining and not data:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(data)
+                counters["in"] += len(data)
+                try:
+                    chunk = await loop.run_in_executor(None, stream.feed, data, not remaining)
+                except (HttpError, csv.Error) as exc:
+                    if not started:
+                        raise HttpError(getattr(exc, "status", 422), str(exc)) from None
+                    print(f"Erro no meio da resposta de /csv: {exc}", file=sys.stderr)
+                    raise StreamAborted(getattr(exc, "status", 422)) from None
+                if chunk:
+                    if not started:
+                        # Só começa a responder depois da detecção: erros de cabeçalho ainda viram 4xx
+                        content_type = f"text/csv; charset={stream.encoding}"
+                        writer.write(_response_head(200, {"Content-Type": content_type, "Transfer-Encoding": "chunked"}))
+                        started = True
+                    framed = b"%x\r\n%s\r\n" % (len(chunk), chunk)
+                    counters["out"] += len(chunk)
+                    # Enquanto o corpo ainda chega, não espera o drain: clientes HTTP comuns só leem a
+                    # resposta depois de enviar o corpo inteiro, e esperar aqui travaria os dois lados.
+                    # O que o cliente ainda não leu fica no buffer do transporte até MAX_PENDING_OUTPUT;
+                    # daí em diante (e até o fim do corpo) a saída vai para um arquivo temporário.
+                    if spill is None and remaining and writer.transport.get_write_buffer_size() >= MAX_PENDING_OUTPUT:
+                        spill = tempfile.TemporaryFile(prefix="imc_server_")
+                    if spill is not None:
+                        await loop.run_in_executor(None, spill.write, framed)
+                    else:
+                        writer.write(framed)
+                if not remaining:
+                    break
+            if not started:
+                raise HttpError(422, "Não foi possível ler o cabeçalho do CSV.")
+            await writer.drain()
+            if spill is not None:
+                spill.seek(0)
+                while True:
+                    block = await loop.run_in_executor(None, spill.read, READ_BYTES)
+                    if not block:
+                        break
+                    writer.write(block)
+                    await writer.drain()
+        finally:
+            stream.close()
+            if spill is not None:
+                spill.close()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        counters["rows"] = stream.stats.total
+        return 200
+
+
+async def serve(host: str, port: int, unix_path: Optional[str] = None) -> None:
+    service = BmiService()
+    if unix_path:
+        server = await asyncio.start_unix_server(service.handle, path=unix_path, limit=MAX_HEADER_BYTES)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(service.handle, host, port, limit=MAX_HEADER_BYTES)
+        where = ", ".join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets)
+    print(f"Serviço de IMC ouvindo em {where}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serviço residente de IMC (HTTP em TCP ou socket Unix).")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço TCP (padrão: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Porta TCP (padrão: 8080)")
+    parser.add_argument("--unix", help="Caminho de um socket Unix (no lugar de TCP)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
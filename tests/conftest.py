@@ -0,0 +1,49 @@
+"""
+Configuração comum dos testes (rode da raiz do repositório com ``python -m pytest tests``).
+
+Coloca a raiz e as pastas dos scripts no sys.path e isola o cache de resultados e o registro
+de layouts de imc_csv.py em um diretório temporário por teste.
+"""
+from __future__ import annotations
+
+import csv
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import add_scripts_to_path  # noqa: E402
+
+add_scripts_to_path()
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("IMC_CSV_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture
+def run_imc_csv():
+    """Executa imc_csv.main com os argumentos e exige sucesso."""
+    import imc_csv
+
+    def run(*argv: object) -> None:
+        assert imc_csv.main([str(a) for a in argv]) == 0
+
+    return run
+
+
+def read_rows(path: Path, delimiter: str = ",") -> List[List[str]]:
+    """Linhas (com cabeçalho) de um CSV gerado, como o csv as lê."""
+    with path.open(encoding="utf-8-sig", newline="") as f:
+        return list(csv.reader(f, delimiter=delimiter))
+
+
+@pytest.fixture(name="read_rows")
+def read_rows_fixture():
+    return read_rows
@@ -0,0 +1,193 @@
+"""Testes de regressão de imc_csv.py em entradas que os CSVs sintéticos limpos não exercitam."""
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import pytest
+
+
+def _bmi_columns(rows):
+    return [row[-2:] for row in rows]
+
+
+def test_passthrough_stray_quote_in_unquoted_field(tmp_path: Path, run_imc_csv, read_rows) -> None:
+    """Aspas no meio de um campo sem aspas são texto comum: não juntam as linhas seguintes."""
+    src = tmp_path / "entrada.csv"
+    src.write_bytes(
+        b"paciente,peso,altura,obs\r\n"
+        b'Ana,55,1.62,tela 12" ok\r\n'
+        b"Bruno,85,1.75,\r\n"
+        b'Carla,70.5,1.68,"linha 1\r\nlinha 2"\r\n'
+        b"Davi,90,1.80,fim\r\n"
+    )
+    run_imc_csv(src, "-o", tmp_path / "raw.csv", "--engine", "passthrough", "--no-cache")
+    run_imc_csv(src, "-o", tmp_path / "pos.csv", "--engine", "positional", "--no-cache")
+    raw = read_rows(tmp_path / "raw.csv")
+    assert [row[0] for row in raw] == ["paciente", "Ana", "Bruno", "Carla", "Davi"]
+    assert raw[1][3] == 'tela 12" ok'
+    assert _bmi_columns(raw) == _bmi_columns(read_rows(tmp_path / "pos.csv"))
+
+
+def test_passthrough_reparses_span_the_csv_reads_differently(tmp_path: Path) -> None:
+    """Um trecho que o csv não lê como um só registro é refeito registro a registro, sem erro."""
+    import imc_csv
+
+    config = imc_csv.PipelineConfig(
+        encoding="utf-8",
+        delimiter=",",
+        fieldnames=("paciente", "peso", "altura"),
+        out_fields=("paciente", "peso", "altura", "imc", "categoria_imc"),
+        weight_col="peso",
+        height_col="altura",
+        decimal_in=".",
+        engine="passthrough",
+    )
+    out = list(imc_csv.iter_passthrough_records([b'"Ana",55,1.62\rBruno,85,1.75\n'], config))
+    assert out == [b"Ana,55,1.62,20.96,Peso normal\n", b"Bruno,85,1.75,27.76,Sobrepeso\n"]
+
+
+def _messy_csv(path: Path, rows: int = 4000) -> Path:
+    from benchmarks.synthetic import DatasetSpec, write_patients_csv
+
+    return write_patients_csv(path, DatasetSpec(rows=rows, messy_ratio=0.05, seed=7))
+
+
+@pytest.mark.parametrize("engine", ["python", "positional", "passthrough"])
+def test_workers_match_single_process_with_stray_quotes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, run_imc_csv, engine: str
+) -> None:
+    """Aspas soltas antes de campos com quebra de linha não deslocam os cortes entre workers."""
+    import imc_csv
+
+    monkeypatch.setattr(imc_csv, "PARALLEL_CHUNK_BYTES", 16 * 1024)  # muitas faixas, muitos cortes
+    src = _messy_csv(tmp_path / "entrada.csv")
+    run_imc_csv(src, "-o", tmp_path / "w1.csv", "--engine", engine, "--no-cache")
+    run_imc_csv(src, "-o", tmp_path / "w4.csv", "--engine", engine, "--workers", 4, "--no-cache")
+    assert (tmp_path / "w4.csv").read_bytes() == (tmp_path / "w1.csv").read_bytes()
+
+
+def test_workers_fall_back_when_a_cut_is_not_a_record_boundary(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture, run_imc_csv
+) -> None:
+    """Se a divisão discorda do csv, a contagem por faixa acusa e o restante roda em um processo só."""
+    import imc_csv
+
+    def ignore_quotes(delimiter):
+        # Varredura que ignora as aspas: corta dentro dos campos com quebra de linha
+        never = re.compile(rb"(?!)")
+        return never, never
+
+    monkeypatch.setattr(imc_csv, "quote_patterns", ignore_quotes)
+    monkeypatch.setattr(imc_csv, "PARALLEL_CHUNK_BYTES", 16 * 1024)
+    src = _messy_csv(tmp_path / "entrada.csv")
+    run_imc_csv(src, "-o", tmp_path / "w1.csv", "--no-cache")
+    run_imc_csv(src, "-o", tmp_path / "w4.csv", "--workers", 4, "--no-cache")
+    assert "não coincidiu" in capsys.readouterr().err
+    assert (tmp_path / "w4.csv").read_bytes() == (tmp_path / "w1.csv").read_bytes()
+
+
+def test_incremental_resumes_after_stray_quotes(
+    tmp_path: Path, capsys: pytest.CaptureFixture, run_imc_csv
+) -> None:
+    """Aspas soltas não deixam o manifesto incompleto: a execução seguinte só lê as linhas novas."""
+    import json
+
+    import imc_csv
+
+    src = _messy_csv(tmp_path / "entrada.csv", rows=500)
+    out = tmp_path / "saida.csv"
+    run_imc_csv(src, "-o", out, "--incremental")
+    assert json.loads(imc_csv.manifest_path(out).read_text(encoding="utf-8"))["complete"]
+    with src.open("ab") as f:
+        f.write(b'Novo 1,70,1.75,tela 12" ok\r\nNovo 2,80,1.80,"a\r\nb"\r\n')
+    capsys.readouterr()
+    run_imc_csv(src, "-o", out, "--incremental")
+    assert "Aviso" not in capsys.readouterr().err
+    run_imc_csv(src, "-o", tmp_path / "completa.csv")
+    assert out.read_bytes() == (tmp_path / "completa.csv").read_bytes()
+
+
+def test_incremental_warns_when_the_manifest_cannot_be_finalized(
+    tmp_path: Path, capsys: pytest.CaptureFixture, run_imc_csv
+) -> None:
+    src = tmp_path / "entrada.csv"
+    src.write_bytes(b"paciente,peso,altura\nAna,55,1.62\nBruno,85,1.75")
+    run_imc_csv(src, "-o", tmp_path / "saida.csv", "--incremental")
+    assert "reprocessará o arquivo inteiro" in capsys.readouterr().err
+
+
+def test_decimal_detection_with_rows_wider_than_a_sample_stratum(tmp_path: Path, run_imc_csv, read_rows) -> None:
+    """Linhas maiores que SAMPLE_STRATUM_BYTES ainda entram na amostra (e a vírgula decimal é detectada)."""
+    from benchmarks.synthetic import DatasetSpec, write_patients_csv
+
+    import imc_csv
+
+    spec = DatasetSpec(rows=40, columns=4000, delimiter=";", decimal=",")
+    src = write_patients_csv(tmp_path / "largo.csv", spec)
+    assert src.stat().st_size // spec.rows > imc_csv.SAMPLE_STRATUM_BYTES
+    out = tmp_path / "saida.csv"
+    run_imc_csv(src, "-o", out, "--no-cache")
+    for row in read_rows(out, ";")[1:]:
+        weight, height = (float(v.replace(",", ".")) for v in row[1:3])
+        assert row[-2] == f"{weight / height ** 2:.2f}"
+
+
+@pytest.mark.parametrize("decimal_in", [".", ","])
+@pytest.mark.parametrize("decimal_out", [".", ","])
+def test_numpy_columns_match_bmi_cells(decimal_in: str, decimal_out: str) -> None:
+    """Conversão e formatação vetorizadas dão o mesmo texto de bmi_cells, com e sem a volta ao parser por célula."""
+    pytest.importorskip("numpy")
+    import imc_csv
+
+    parse = imc_csv.make_number_parser(decimal_in)
+
+    def point(text: str) -> str:
+        return text.replace(".", decimal_in)
+
+    valid = [point(v) for v in ("70", " 70.5 ", "1e3", "1_000", "nan", "inf", "0", "-5", "1e12", "0.5", "66.8")]
+    heights = [point(v) for v in ("1.75", "175", "1.80", "2", "1.7", "1.7", "1.6", "1.7", "1.5", "0.001", "1.84")]
+    weights_sets = [valid, valid[:-1] + ["", "n/d", "1.234,5", "1,234.5"]]
+    heights_sets = [heights, heights[:-1] + ["1.7", "1.7", "1.7", "1.7"]]
+    for weights, hs in zip(weights_sets, heights_sets):
+        imc, categories, errors = imc_csv.compute_bmi_columns(weights, hs, decimal_in, decimal_out)
+        expected = [imc_csv.bmi_cells(w, h, parse) for w, h in zip(weights, hs)]
+        assert imc == [value.replace(".", decimal_out) for value, _, _ in expected]
+        assert categories == [category for _, category, _ in expected]
+        assert errors == sum(not ok for _, _, ok in expected)
+    # Valores a meio centésimo (x.xx5) e com muitos dígitos usam a mesma regra de arredondamento da f-string
+    bmis = [9.995, 0.125, 99.995, 23.005, 1e9 / 3, 12345678.9]
+    imc, _, _ = imc_csv.compute_bmi_columns([point(str(b)) for b in bmis], ["1"] * len(bmis), decimal_in, decimal_out)
+    assert imc == [f"{parse(point(str(b))):.2f}".replace(".", decimal_out) for b in bmis]
+
+
+def test_functions_moved_to_imc_core_are_still_importable_from_imc_csv() -> None:
+    from imc_csv import (
+        categorize_bmi,
+        detect_decimal_from_values,
+        find_weight_height_columns,
+        normalize_name,
+        parse_number,
+    )
+
+    assert parse_number("1.234,5", ",") == 1234.5
+    assert categorize_bmi(22.0) == "Peso normal"
+    assert detect_decimal_from_values(["70,5", "1,75"]) == ","
+    assert normalize_name(" Peso (kg) ") == "peso_kg"
+    assert find_weight_height_columns(["Paciente", "Peso", "Altura"]) == ("Peso", "Altura")
+
+
+def test_result_cache_is_opt_in(
+    tmp_path: Path, capsys: pytest.CaptureFixture, isolated_cache: Path, run_imc_csv
+) -> None:
+    """Sem --cache, nenhuma cópia da saída (dados de pacientes) vai para o diretório do cache."""
+    src = _messy_csv(tmp_path / "entrada.csv", rows=50)
+    run_imc_csv(src, "-o", tmp_path / "saida.csv")
+    assert not list(isolated_cache.glob("*.out"))
+    run_imc_csv(src, "-o", tmp_path / "saida.csv", "--cache")
+    assert len(list(isolated_cache.glob("*.out"))) == 1
+    capsys.readouterr()
+    run_imc_csv(src, "-o", tmp_path / "saida.csv", "--cache")
+    assert "copiado do cache" in capsys.readouterr().out
+    run_imc_csv(src, "-o", tmp_path / "outra.csv", "--cache", "--no-cache")
+    assert "copiado do cache" not in capsys.readouterr().out
@@ -0,0 +1,86 @@
+"""Testes de POST /csv de imc_core.server: mesma saída de ``imc_csv.py --engine positional``."""
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Tuple
+
+import pytest
+
+from benchmarks.synthetic import DatasetSpec, write_patients_csv
+from imc_core import server
+
+
+def post_csv(body: bytes, query: str = "") -> Tuple[int, bytes]:
+    """Sobe o serviço em uma porta livre, envia ``body`` a /csv e devolve (status, corpo da resposta)."""
+
+    async def exchange() -> bytes:
+        listener = await asyncio.start_server(server.BmiService().handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            head = f"POST /csv{query} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+            writer.write(head.encode("latin-1") + body)
+            raw = await reader.read()
+            writer.close()
+        return raw
+
+    head, _, payload = asyncio.run(exchange()).partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+    if b"transfer-encoding: chunked" not in head.lower():
+        return status, payload
+    body_out = b""
+    while True:
+        size, _, payload = payload.partition(b"\r\n")
+        if not int(size, 16):
+            return status, body_out
+        body_out += payload[: int(size, 16)]
+        payload = payload[int(size, 16) + 2:]
+
+
+def cli_output(tmp_path: Path, src: Path, run_imc_csv) -> bytes:
+    out = tmp_path / "cli.csv"
+    run_imc_csv(src, "-o", out, "--engine", "positional", "--no-cache", "--no-schema-registry")
+    return out.read_bytes()
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        DatasetSpec(rows=3000, messy_ratio=0.05, cm_ratio=0.2, invalid_ratio=0.01),
+        DatasetSpec(rows=3000, delimiter=";", decimal=",", messy_ratio=0.05),
+        # Exportação ordenada por clínica: o primeiro bloco só tem inteiros
+        DatasetSpec(rows=3000, delimiter=";", decimal=",", integer_rows=1000),
+    ],
+    ids=["virgula", "ponto-e-virgula", "inicio-inteiro"],
+)
+def test_csv_matches_cli(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, run_imc_csv, spec: DatasetSpec) -> None:
+    monkeypatch.setattr(server, "READ_BYTES", 4096)  # corpo em muitos blocos
+    src = write_patients_csv(tmp_path / "entrada.csv", spec)
+    status, body = post_csv(src.read_bytes())
+    assert status == 200
+    assert body == cli_output(tmp_path, src, run_imc_csv)
+
+
+def test_csv_without_decimal_evidence_within_the_limit_is_rejected(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server, "READ_BYTES", 4096)
+    monkeypatch.setattr(server, "MAX_UNDECIDED_BYTES", 16 * 1024)
+    spec = DatasetSpec(rows=3000, delimiter=";", decimal=",", integer_rows=2000)
+    src = write_patients_csv(tmp_path / "entrada.csv", spec)
+    status, body = post_csv(src.read_bytes())
+    assert status == 400
+    assert "decimal" in json.loads(body)["error"]
+    status, _ = post_csv(src.read_bytes(), "?decimal=,")
+    assert status == 200
+
+
+def test_csv_rejects_a_quoted_field_that_never_closes(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(server, "READ_BYTES", 4096)
+    monkeypatch.setattr(server, "MAX_PENDING_RECORD", 16 * 1024)
+    body = b"paciente,peso,altura,obs\nBruno,85.1,1.75,\"sem fim\n" + b"Carla,70.2,1.68,x\n" * 2000
+    status, payload = post_csv(body)
+    assert status == 400
+    assert "aspas" in json.loads(payload)["error"]